@@ -1,13 +1,43 @@
 """AI generation module using Claude API."""
 
 import json
+import time
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, Iterator, Tuple
 import requests
 from ..config import Config
+from ..utils.json_stream import IncrementalJSONExtractor, extract_json_object
+from ..utils.structured_logging import request_context, truncate
 
 logger = logging.getLogger(__name__)
 
+REQUIRED_FIELDS = ['texte_presentation', 'informations_acces']
+
+# Yielded by stream_generate_with_ai when previously yielded fields are void
+STREAM_RESET = 'reset'
+
+# Tool definition used to force structured output from Claude
+GENERATION_TOOL = {
+    'name': 'rediger_textes_devis',
+    'description': 'Enregistre les textes commerciaux générés pour le devis.',
+    'input_schema': {
+        'type': 'object',
+        'properties': {
+            'texte_presentation': {
+                'type': 'string',
+                'description': 'Texte de présentation commercial du lieu'
+            },
+            'informations_acces': {
+                'type': 'string',
+                'description': "Informations pratiques d'accès et transport"
+            }
+        },
+        'required': REQUIRED_FIELDS
+    }
+}
+
 
 class AIGenerationError(Exception):
     """Custom exception for AI generation errors."""
@@ -59,30 +89,51 @@ IMPORTANT :
 NE RÉPONDS RIEN D'AUTRE QUE LE JSON."""
 
 
-def call_claude_api(prompt: str, config: Config = None) -> Dict[str, Any]:
-    """Call Claude API with error handling.
+def get_prompt_version(config: Config = None) -> str:
+    """Identify the prompt template and model used for generation.
+    
+    Precomputed texts are regenerated when this value changes.
     
     Args:
-        prompt: The prompt to send
         config: Configuration object
     
     Returns:
-        API response as dict
-    
-    Raises:
-        AIGenerationError: If API call fails
+        Short hex digest of the prompt template, model and output mode
     """
     if config is None:
         config = Config
     
-    if not config.CLAUDE_API_KEY:
-        raise AIGenerationError('Claude API key is not configured')
+    return _prompt_version(config.CLAUDE_MODEL, bool(getattr(config, 'CLAUDE_USE_TOOLS', False)))
+
+
+@lru_cache(maxsize=32)
+def _prompt_version(model: str, use_tools: bool) -> str:
+    """Hash the prompt template, model and output mode (cached per pair)."""
+    template = create_prompt('{titre}', '{adresse}')
+    source = '|'.join([
+        template,
+        model,
+        json.dumps(GENERATION_TOOL, sort_keys=True) if use_tools else ''
+    ])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]
+
+
+def build_payload(prompt: str, config: Config = None, stream: bool = False) -> Dict[str, Any]:
+    """Build the Messages API payload.
     
-    headers = {
-        'Content-Type': 'application/json',
-        'x-api-key': config.CLAUDE_API_KEY,
-        'anthropic-version': '2023-06-01'
-    }
+    When ``CLAUDE_USE_TOOLS`` is enabled, Claude is forced to answer through
+    the generation tool so the output is structured JSON.
+    
+    Args:
+        prompt: The prompt to send
+        config: Configuration object
+        stream: Whether to request a server-sent events stream
+    
+    Returns:
+        Request payload as dict
+    """
+    if config is None:
+        config = Config
     
     payload = {
         'model': config.CLAUDE_MODEL,
@@ -92,20 +143,65 @@ def call_claude_api(prompt: str, config: Config = None) -> Dict[str, Any]:
         ]
     }
     
+    if getattr(config, 'CLAUDE_USE_TOOLS', False):
+        payload['tools'] = [GENERATION_TOOL]
+        payload['tool_choice'] = {'type': 'tool', 'name': GENERATION_TOOL['name']}
+    
+    if stream:
+        payload['stream'] = True
+    
+    return payload
+
+
+def _build_headers(config: Config) -> Dict[str, str]:
+    """Build API headers, checking that the key is configured."""
+    if not config.CLAUDE_API_KEY:
+        raise AIGenerationError('Claude API key is not configured')
+    
+    return {
+        'Content-Type': 'application/json',
+        'x-api-key': config.CLAUDE_API_KEY,
+        'anthropic-version': '2023-06-01'
+    }
+
+
+def call_claude_api(prompt: str, config: Config = None) -> Dict[str, Any]:
+    """Call Claude API with error handling.
+    
+    Args:
+        prompt: The prompt to send
+        config: Configuration object
+    
+    Returns:
+        API response as dict
+    
+    Raises:
+        AIGenerationError: If API call fails
+    """
+    if config is None:
+        config = Config
+    
+    headers = _build_headers(config)
+    payload = build_payload(prompt, config)
+    
     try:
-        logger.info(f'Calling Claude API with model: {config.CLAUDE_MODEL}')
+        logger.info('Calling Claude API with model: %s', config.CLAUDE_MODEL, extra={'sample': True})
+        started = time.perf_counter()
         response = requests.post(
             config.CLAUDE_API_URL,
             headers=headers,
             json=payload,
             timeout=30
         )
+        duration_ms = round((time.perf_counter() - started) * 1000)
         
         if response.status_code != 200:
-            error_msg = f'API returned status {response.status_code}: {response.text}'
-            logger.error(error_msg)
+            error_msg = f'API returned status {response.status_code}: {truncate(response.text)}'
+            logger.error(error_msg, extra={'duration_ms': duration_ms})
             raise AIGenerationError(error_msg)
         
+        logger.info('Claude API responded in %d ms', duration_ms,
+                    extra={'sample': True, 'duration_ms': duration_ms})
         return response.json()
         
     except requests.exceptions.Timeout:
@@ -119,9 +215,104 @@ def call_claude_api(prompt: str, config: Config = None) -> Dict[str, Any]:
         raise AIGenerationError(error_msg)
 
 
+def stream_claude_api(prompt: str, config: Config = None) -> Iterator[str]:
+    """Call Claude API in streaming mode.
+    
+    Yields the raw text fragments of the answer: ``text_delta`` text, or the
+    ``partial_json`` of the generation tool input in tool-use mode.
+    
+    Args:
+        prompt: The prompt to send
+        config: Configuration object
+    
+    Yields:
+        Output fragments as they arrive
+    
+    Raises:
+        AIGenerationError: If API call fails
+    """
+    if config is None:
+        config = Config
+    
+    headers = _build_headers(config)
+    payload = build_payload(prompt, config, stream=True)
+    
+    try:
+        logger.info('Streaming Claude API with model: %s', config.CLAUDE_MODEL, extra={'sample': True})
+        with requests.post(
+            config.CLAUDE_API_URL,
+            headers=headers,
+            json=payload,
+            timeout=30,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                error_msg = f'API returned status {response.status_code}: {truncate(response.text)}'
+                logger.error(error_msg)
+                raise AIGenerationError(error_msg)
+            
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                
+                try:
+                    event = json.loads(line[len('data:'):].strip())
+                except json.JSONDecodeError:
+                    continue
+                
+                if event.get('type') == 'error':
+                    error_msg = f"API stream error: {event.get('error', {}).get('message', 'unknown')}"
+                    logger.error(error_msg)
+                    raise AIGenerationError(error_msg)
+                
+                if event.get('type') != 'content_block_delta':
+                    continue
+                
+                delta = event.get('delta', {})
+                if delta.get('type') == 'text_delta':
+                    yield delta.get('text', '')
+                elif delta.get('type') == 'input_json_delta':
+                    yield delta.get('partial_json', '')
+    
+    except requests.exceptions.Timeout:
+        error_msg = 'API request timed out after 30 seconds'
+        logger.error(error_msg)
+        raise AIGenerationError(error_msg)
+    
+    except requests.exceptions.RequestException as e:
+        error_msg = f'API request failed: {str(e)}'
+        logger.error(error_msg)
+        raise AIGenerationError(error_msg)
+
+
+def validate_generated_content(generated_content: Dict[str, Any]) -> Dict[str, str]:
+    """Check that generated content has every required text field.
+    
+    Args:
+        generated_content: Decoded model output
+    
+    Returns:
+        The required fields
+    
+    Raises:
+        AIGenerationError: If a field is missing or invalid
+    """
+    for field in REQUIRED_FIELDS:
+        if field not in generated_content:
+            raise AIGenerationError(f'Missing required field: {field}')
+        
+        if not generated_content[field] or not isinstance(generated_content[field], str):
+            raise AIGenerationError(f'Invalid content for field: {field}')
+    
+    return {field: generated_content[field] for field in REQUIRED_FIELDS}
+
+
 def parse_claude_response(api_response: Dict[str, Any]) -> Dict[str, str]:
     """Parse and validate Claude API response.
     
+    Tool-use blocks are read directly. Text blocks are scanned for the first
+    balanced JSON object, so fences or stray prose around it are ignored.
+    
     Args:
         api_response: Raw API response
     
@@ -132,45 +323,41 @@ def parse_claude_response(api_response: Dict[str, Any]) -> Dict[str, str]:
         AIGenerationError: If response parsing fails
     """
     try:
-        # Extract text from response
-        content = api_response['content'][0]['text']
-        
-        # Clean markdown formatting if present
-        content = content.replace('```json\n', '').replace('```\n', '').replace('```', '').strip()
-        
-        # Parse JSON
-        generated_content = json.loads(content)
+        generated_content = None
         
-        # Validate required fields
-        required_fields = ['texte_presentation', 'informations_acces']
-        for field in required_fields:
-            if field not in generated_content:
-                raise AIGenerationError(f'Missing required field: {field}')
+        for block in api_response['content']:
+            if block.get('type') == 'tool_use' and isinstance(block.get('input'), dict):
+                generated_content = block['input']
+            elif block.get('type') == 'text':
+                generated_content = extract_json_object(block['text'])
             
-            if not generated_content[field] or not isinstance(generated_content[field], str):
-                raise AIGenerationError(f'Invalid content for field: {field}')
+            if generated_content is not None:
+                break
         
-        logger.info('Successfully parsed Claude response')
-        return generated_content
+        if generated_content is None:
+            raise AIGenerationError('No JSON object found in API response')
         
-    except json.JSONDecodeError as e:
-        error_msg = f'Failed to parse JSON response: {str(e)}'
-        logger.error(error_msg)
-        raise AIGenerationError(error_msg)
+        result = validate_generated_content(generated_content)
+        
+        logger.info('Successfully parsed Claude response', extra={'sample': True})
+        return result
     
-    except (KeyError, IndexError) as e:
+    except (KeyError, IndexError, TypeError, AttributeError) as e:
         error_msg = f'Unexpected API response structure: {str(e)}'
         logger.error(error_msg)
         raise AIGenerationError(error_msg)
 
 
-def generate_with_ai(titre: str, adresse: str, config: Config = None) -> Dict[str, str]:
+def generate_with_ai(titre: str, adresse: str, config: Config = None,
+                     request_id: Optional[str] = None) -> Dict[str, str]:
     """Generate commercial texts using Claude AI.
     
     Args:
         titre: Venue title/name
         adresse: Venue address
         config: Configuration object
+        request_id: Request id attached to log lines (defaults to the
+            current context's, e.g. the HTTP request's)
     
     Returns:
         Dict with texte_presentation and informations_acces
@@ -185,11 +372,67 @@ def generate_with_ai(titre: str, adresse: str, config: Config = None) -> Dict[st
     if not adresse or not adresse.strip():
         raise AIGenerationError('Adresse cannot be empty')
     
-    # Create prompt
+    with request_context(request_id):
+        # Create prompt
+        prompt = create_prompt(titre.strip(), adresse.strip())
+        
+        # Call API
+        api_response = call_claude_api(prompt, config)
+        
+        # Parse and return
+        return parse_claude_response(api_response)
+
+
+def stream_generate_with_ai(titre: str, adresse: str,
+                            config: Config = None) -> Iterator[Tuple[str, str]]:
+    """Generate commercial texts, yielding each field as soon as it is complete.
+    
+    If the fields yielded so far came from text that turned out not to be
+    the JSON answer, ``(STREAM_RESET, '')`` is yielded: callers must drop
+    them, the right values follow.
+    
+    Args:
+        titre: Venue title/name
+        adresse: Venue address
+        config: Configuration object
+    
+    Yields:
+        (field, text) tuples for texte_presentation and informations_acces
+    
+    Raises:
+        AIGenerationError: If generation fails or a field is missing
+    """
+    if not titre or not titre.strip():
+        raise AIGenerationError('Titre cannot be empty')
+    
+    if not adresse or not adresse.strip():
+        raise AIGenerationError('Adresse cannot be empty')
+    
     prompt = create_prompt(titre.strip(), adresse.strip())
+    extractor = IncrementalJSONExtractor()
+    resets = 0
+    
+    def completed(fields: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+        nonlocal resets
+        if extractor.resets != resets:
+            resets = extractor.resets
+            yield STREAM_RESET, ''
+        
+        for field, value in fields.items():
+            if field not in REQUIRED_FIELDS:
+                continue
+            
+            if not value or not isinstance(value, str):
+                raise AIGenerationError(f'Invalid content for field: {field}')
+            
+            yield field, value
+    
+    for chunk in stream_claude_api(prompt, config):
+        yield from completed(extractor.feed(chunk))
+        
+        if extractor.complete:
+            break
     
-    # Call API
-    api_response = call_claude_api(prompt, config)
+    yield from completed(extractor.finish())
     
-    # Parse and return
-    return parse_claude_response(api_response)
+    validate_generated_content(extractor.fields)
@@ -0,0 +1,341 @@
+"""Generation cache for precomputed venue texts.
+
+Texts for the Les Domaines Rares venue catalog are generated offline (see
+``backend/precompute.py``) and stored in a versioned JSON file. The file is
+loaded at server start, and reloaded when it changes, so that requests for
+a known venue are answered without calling Claude.
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT_VERSION = 2
+
+
+def normalize(text: str) -> str:
+    """Normalize venue text for comparison (case and whitespace)."""
+    if not text or not isinstance(text, str):
+        return ''
+    return ' '.join(text.split()).casefold()
+
+
+def lookup_key(titre: str, adresse: str) -> str:
+    """Build the cache lookup key for a venue.
+
+    Args:
+        titre: Venue title/name
+        adresse: Venue address
+
+    Returns:
+        Stable key, insensitive to case and spacing
+    """
+    return f'{normalize(titre)}|{normalize(adresse)}'
+
+
+def venue_hash(titre: str, adresse: str) -> str:
+    """Hash the venue data used by the prompt.
+
+    Args:
+        titre: Venue title/name
+        adresse: Venue address
+
+    Returns:
+        Short hex digest
+    """
+    return hashlib.sha256(lookup_key(titre, adresse).encode('utf-8')).hexdigest()[:16]
+
+
+def load_catalog(path: str) -> List[Dict[str, str]]:
+    """Read a venue catalog from a CSV or JSON file.
+
+    CSV files need ``titre`` and ``adresse`` columns, and may have an ``id``
+    column. JSON files contain a list of such objects, or ``{"venues": [...]}``.
+    Venues without an id are identified by their normalized title.
+
+    Args:
+        path: Catalog file path
+
+    Returns:
+        List of venues with id, titre and adresse
+
+    Raises:
+        ValueError: If the file format or a venue is invalid
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+    elif path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        rows = data.get('venues', []) if isinstance(data, dict) else data
+    else:
+        raise ValueError(f'Unsupported catalog format: {path}')
+
+    venues = []
+    seen = set()
+    for idx, row in enumerate(rows):
+        titre = (row.get('titre') or '').strip()
+        adresse = (row.get('adresse') or '').strip()
+        if not titre or not adresse:
+            raise ValueError(f'Venue {idx + 1}: titre and adresse are required')
+
+        venue_id = str(row.get('id') or '').strip() or normalize(titre)
+        if venue_id in seen:
+            raise ValueError(f'Venue {idx + 1}: duplicate id {venue_id}')
+        seen.add(venue_id)
+
+        venues.append({'id': venue_id, 'titre': titre, 'adresse': adresse})
+
+    return venues
+
+
+class GenerationCache:
+    """In-memory cache of generated texts, backed by a versioned JSON store.
+
+    The store keeps, for each venue id, one entry per prompt version, so
+    tenants or reloaded settings using another model are served as well.
+    Entries are indexed by prompt version and ``lookup_key(titre, adresse)``
+    for request-time lookups.
+
+    ``prompt_version`` is the default version for lookups and the version
+    of entries added with ``put``.
+
+    Lookups do not lock: ``load`` and ``prune`` build new entries and index
+    aside and publish them with a single assignment, so readers see either
+    the old or the new index, never a partial one.
+    """
+
+    def __init__(self, prompt_version: str = ''):
+        self.prompt_version = prompt_version
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._index: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def __len__(self) -> int:
+        index = self._index
+        return len(index)
+
+    @property
+    def prompt_versions(self) -> List[str]:
+        """Prompt versions with cached texts."""
+        keys = tuple(self._index)
+        return sorted({version for version, _ in keys})
+
+    def get(self, titre: str, adresse: str,
+            prompt_version: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """Look up precomputed texts for a venue.
+
+        Args:
+            titre: Venue title/name
+            adresse: Venue address
+            prompt_version: Prompt version of the caller's configuration
+                (defaults to the cache's)
+
+        Returns:
+            Dict with texte_presentation and informations_acces, or None
+        """
+        version = self.prompt_version if prompt_version is None else prompt_version
+        result = self._index.get((version, lookup_key(titre, adresse)))
+        return dict(result) if result is not None else None
+
+    def entry(self, venue_id: str, prompt_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for a venue id and prompt version, if any."""
+        version = self.prompt_version if prompt_version is None else prompt_version
+        return self._entries.get(venue_id, {}).get(version)
+
+    def is_fresh(self, venue: Dict[str, str], prompt_version: Optional[str] = None) -> bool:
+        """Check whether a venue's stored texts are up to date.
+
+        Args:
+            venue: Catalog venue with id, titre and adresse
+            prompt_version: Prompt version to check (defaults to the cache's)
+
+        Returns:
+            True if texts exist for the prompt version and the venue data
+            is unchanged
+        """
+        entry = self.entry(venue['id'], prompt_version)
+        return (
+            entry is not None
+            and entry.get('venue_hash') == venue_hash(venue['titre'], venue['adresse'])
+        )
+
+    def put(self, venue: Dict[str, str], result: Dict[str, str],
+            prompt_version: Optional[str] = None) -> None:
+        """Store generated texts for a catalog venue.
+
+        Args:
+            venue: Catalog venue with id, titre and adresse
+            result: Generated texte_presentation and informations_acces
+            prompt_version: Prompt version used (defaults to the cache's)
+        """
+        version = self.prompt_version if prompt_version is None else prompt_version
+        entry = {
+            'titre': venue['titre'],
+            'adresse': venue['adresse'],
+            'venue_hash': venue_hash(venue['titre'], venue['adresse']),
+            'prompt_version': version,
+            'generated_at': datetime.now().isoformat(),
+            'texte_presentation': result['texte_presentation'],
+            'informations_acces': result['informations_acces']
+        }
+        with self._lock:
+            versions = self._entries.setdefault(venue['id'], {})
+            previous = versions.get(version)
+            versions[version] = entry
+            key = self._index_entry(self._index, entry)
+            if previous is not None:
+                previous_key = (version, lookup_key(previous['titre'], previous['adresse']))
+                if previous_key != key:
+                    self._index.pop(previous_key, None)
+
+    def prune(self, venue_ids: List[str], prompt_versions: Optional[List[str]] = None) -> List[str]:
+        """Drop entries for venues no longer in the catalog.
+
+        Args:
+            venue_ids: Ids of the current catalog
+            prompt_versions: Prompt versions still in use; entries for other
+                versions are dropped too if given
+
+        Returns:
+            Removed venue ids
+        """
+        keep = set(venue_ids)
+        with self._lock:
+            removed = [vid for vid in self._entries if vid not in keep]
+            entries = {
+                vid: {
+                    version: entry for version, entry in versions.items()
+                    if prompt_versions is None or version in prompt_versions
+                }
+                for vid, versions in self._entries.items() if vid in keep
+            }
+            self._publish(entries)
+        return removed
+
+    def load(self, path: str) -> int:
+        """Load a store file, replacing the cached entries.
+
+        Args:
+            path: Store file path
+
+        Returns:
+            Number of entries served from the cache
+        """
+        if not os.path.exists(path):
+            logger.info('No generation cache file at %s', path)
+            return 0
+
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error('Failed to load generation cache %s: %s', path, e)
+            return 0
+
+        if data.get('format_version') == 1:
+            # One entry per venue, for a single prompt version
+            entries = {
+                vid: {entry.get('prompt_version', ''): entry}
+                for vid, entry in data.get('entries', {}).items()
+            }
+        elif data.get('format_version') == STORE_FORMAT_VERSION:
+            entries = data.get('entries', {})
+        else:
+            logger.warning('Ignoring generation cache %s: unsupported format', path)
+            return 0
+
+        with self._lock:
+            self._publish({vid: dict(versions) for vid, versions in entries.items()})
+            self._mtime = mtime
+
+        count = len(self)
+        logger.info('Loaded %d cached venue texts from %s (%d prompt versions)',
+                    count, path, len(self.prompt_versions))
+        return count
+
+    def watch(self, path: str, interval: float) -> None:
+        """Reload the store file in a background thread when it changes.
+
+        Lets a running server pick up the output of a precompute run.
+
+        Args:
+            path: Store file path
+            interval: Seconds between checks (0 disables watching)
+        """
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                if mtime != self._mtime:
+                    self.load(path)
+
+        self._watcher = threading.Thread(target=run, name='generation-cache-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop the file watcher."""
+        self._stop.set()
+
+    def save(self, path: str) -> None:
+        """Write the store file atomically.
+
+        Args:
+            path: Store file path
+        """
+        with self._lock:
+            data = {
+                'format_version': STORE_FORMAT_VERSION,
+                'updated_at': datetime.now().isoformat(),
+                'entries': {vid: dict(versions) for vid, versions in self._entries.items()}
+            }
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _publish(self, entries: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        """Index new entries aside, then swap them in (lock held)."""
+        index: Dict[Tuple[str, str], Dict[str, str]] = {}
+        for versions in entries.values():
+            for entry in versions.values():
+                self._index_entry(index, entry)
+
+        self._entries = entries
+        self._index = index
+
+    @staticmethod
+    def _index_entry(index: Dict[Tuple[str, str], Dict[str, str]],
+                     entry: Dict[str, Any]) -> Tuple[str, str]:
+        """Add an entry to a lookup index and return its key."""
+        key = (entry.get('prompt_version', ''), lookup_key(entry['titre'], entry['adresse']))
+        index[key] = {
+            'texte_presentation': entry['texte_presentation'],
+            'informations_acces': entry['informations_acces']
+        }
+        return key
@@ -1,20 +1,605 @@
 """Quote management module for CRUD operations."""
 
+import os
+import re
+import uuid
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Iterator
 from datetime import datetime
 import json
+from ..utils.delta import compute_delta, apply_delta
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+QUOTE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class QuoteNotFoundError(Exception):
+    """Raised when a quote or one of its revisions does not exist."""
+    pass
+
+
+class QuoteConflictError(Exception):
+    """Raised when a save is based on an outdated revision."""
+    pass
+
 
 class QuoteManager:
     """Manager for quote operations.
     
-    Future: Will handle database CRUD operations.
-    Currently provides structure for quote data.
+    Static helpers validate, sanitize and summarize quote data. An instance
+    also keeps the revision history of saved quotes: each save is stored as
+    a structural delta from the previous revision, with a full snapshot every
+    ``snapshot_interval`` revisions so any revision is rebuilt from at most
+    that many deltas. With a ``storage_dir``, revisions are appended to one
+    JSON-lines file per quote.
+    
+    Every change is also given a server-wide sequence number, recorded in a
+    change log, so clients can sync only the quotes changed since their last
+    cursor (see ``sync``).
+    
+    Several processes (e.g. gunicorn workers) may share a ``storage_dir``:
+    writes are serialized by a lock file, sequence numbers are allocated
+    from the change log while holding it, and the histories and change
+    index cached in memory are brought up to date from the files before use.
     """
     
+    def __init__(self, storage_dir: Optional[str] = None, snapshot_interval: int = 20):
+        self.storage_dir = storage_dir
+        self.snapshot_interval = max(1, snapshot_interval)
+        self._histories: Dict[str, Dict[str, Any]] = {}
+        self._changes: Dict[str, int] = {}
+        self._seq = 0
+        self._log_offset = 0
+        self._lock = threading.RLock()
+        self._store_locked = False
+        
+        if storage_dir:
+            os.makedirs(storage_dir, exist_ok=True)
+            self._log_unlogged_quotes()
+    
+    def save_quote(self, data: Dict[str, Any], quote_id: Optional[str] = None,
+                   base_revision: Optional[int] = None) -> Dict[str, Any]:
+        """Save a new revision of a quote.
+        
+        Args:
+            data: Full quote data
+            quote_id: Existing quote id; a new quote is created if omitted
+                or unknown
+            base_revision: Revision the change was made from (0 for a new
+                quote); checked against the latest revision if given
+        
+        Returns:
+            Revision metadata (id, revision, timestamp, type, changes, seq)
+        
+        Raises:
+            ValueError: If the quote id is invalid
+            QuoteConflictError: If ``base_revision`` is not the latest revision
+        """
+        quote_id = quote_id or uuid.uuid4().hex
+        self._check_id(quote_id)
+        
+        # Detach from the caller's object and normalize to JSON types
+        data = json.loads(json.dumps(data))
+        
+        with self._write_lock():
+            history = self._history(quote_id, create=True)
+            self._check_base_revision(quote_id, history, base_revision)
+            current = history['current']
+            revision = len(history['records']) + 1
+            
+            if current is None:
+                delta = None
+            else:
+                delta = compute_delta(current, data)
+                if not delta:
+                    return self._revision_info(quote_id, history['records'][-1])
+            
+            record = {
+                'revision': revision,
+                'timestamp': datetime.now().isoformat(),
+                'changes': len(delta) if delta is not None else 0,
+                'seq': self._next_seq()
+            }
+            
+            if delta is None or (revision - 1) % self.snapshot_interval == 0 or \
+                    len(json.dumps(delta)) >= len(json.dumps(data)):
+                record['snapshot'] = data
+            else:
+                record['delta'] = delta
+            
+            self._append(quote_id, history, record)
+            history['current'] = data
+            self._histories[quote_id] = history
+            self._log_change(quote_id, record['seq'])
+        
+        logger.info('Saved quote %s revision %d', quote_id, revision,
+                    extra={'sample': True, 'quote_id': quote_id})
+        return self._revision_info(quote_id, record)
+    
+    def delete_quote(self, quote_id: str, base_revision: Optional[int] = None) -> Dict[str, Any]:
+        """Delete a quote by recording a tombstone revision.
+        
+        Earlier revisions stay readable; saving the quote again restarts it
+        from a full snapshot.
+        
+        Args:
+            quote_id: Quote id
+            base_revision: Revision the deletion was made from, checked
+                against the latest revision if given
+        
+        Returns:
+            Revision metadata of the tombstone
+        
+        Raises:
+            QuoteNotFoundError: If the quote does not exist
+            QuoteConflictError: If ``base_revision`` is not the latest revision
+        """
+        with self._write_lock():
+            history = self._history(quote_id)
+            self._check_base_revision(quote_id, history, base_revision)
+            
+            if history['current'] is None:
+                return self._revision_info(quote_id, history['records'][-1])
+            
+            record = {
+                'revision': len(history['records']) + 1,
+                'timestamp': datetime.now().isoformat(),
+                'changes': 0,
+                'seq': self._next_seq(),
+                'deleted': True
+            }
+            
+            self._append(quote_id, history, record)
+            history['current'] = None
+            self._log_change(quote_id, record['seq'])
+        
+        logger.info('Deleted quote %s', quote_id, extra={'quote_id': quote_id})
+        return self._revision_info(quote_id, record)
+    
+    def changes_since(self, cursor: int = 0, limit: int = 50) -> Dict[str, Any]:
+        """List quotes changed after a sync cursor.
+        
+        Args:
+            cursor: Last sequence number seen by the client (0 for all)
+            limit: Maximum number of quotes returned
+        
+        Returns:
+            Dict with changes (id, revision, seq, timestamp and data, or
+            deleted), the next cursor and whether more changes are pending
+        """
+        limit = max(1, limit)
+        
+        with self._lock:
+            self._read_change_log()
+            
+            # A cursor ahead of the server means the store was reset
+            if cursor > self._seq:
+                cursor = 0
+            
+            pending = sorted((seq, quote_id) for quote_id, seq in self._changes.items() if seq > cursor)
+            page = pending[:limit]
+            has_more = len(pending) > limit
+            
+            changes = []
+            for seq, quote_id in page:
+                history = self._history(quote_id)
+                record = history['records'][-1]
+                change = {
+                    'id': quote_id,
+                    'revision': record['revision'],
+                    'seq': seq,
+                    'timestamp': record['timestamp']
+                }
+                if history['current'] is None:
+                    change['deleted'] = True
+                else:
+                    change['data'] = json.loads(json.dumps(history['current']))
+                changes.append(change)
+            
+            return {
+                'changes': changes,
+                'cursor': page[-1][0] if has_more else self._seq,
+                'hasMore': has_more
+            }
+    
+    def sync(self, changes: List[Dict[str, Any]], cursor: int = 0, limit: int = 50) -> Dict[str, Any]:
+        """Apply a batch of client changes, then return server changes.
+        
+        Each client change is ``{"id", "baseRevision", "data"}`` or
+        ``{"id", "baseRevision", "deleted": true}``. A change whose base
+        revision is not the server's latest revision is not applied and is
+        reported as a conflict, with the server version.
+        
+        Only the first ``limit`` changes are processed; the others are left
+        out of the response and the client sends them again, in batches of
+        at most ``batchSize`` (returned).
+        
+        Args:
+            changes: Client changes
+            cursor: Last sequence number seen by the client
+            limit: Maximum number of uploaded and returned changes
+        
+        Returns:
+            Dict with accepted, conflicts, rejected, changes, cursor,
+            hasMore and batchSize
+        
+        Raises:
+            ValueError: If the batch is malformed
+        """
+        if not isinstance(changes, list):
+            raise ValueError('changes must be an array')
+        
+        limit = max(1, limit)
+        changes = changes[:limit]
+        
+        accepted, conflicts, rejected = [], [], []
+        skip = {}
+        
+        with self._lock:
+            for change in changes:
+                quote_id = change.get('id') if isinstance(change, dict) else None
+                try:
+                    if not quote_id:
+                        raise ValueError('Change must have an id')
+                    
+                    base_revision = int(change.get('baseRevision') or 0)
+                    if change.get('deleted'):
+                        info = self.delete_quote(quote_id, base_revision)
+                    elif isinstance(change.get('data'), dict):
+                        data = self.sanitize_quote_data(change['data'])
+                        info = self.save_quote(data, quote_id, base_revision)
+                    else:
+                        raise ValueError('Change must have data or deleted')
+                    
+                    accepted.append({'id': quote_id, 'revision': info['revision'], 'seq': info['seq']})
+                    skip[quote_id] = info['seq']
+                
+                except QuoteConflictError:
+                    # An unknown quote (e.g. after a store reset) is reported
+                    # as deleted at revision 0
+                    history = self._history(quote_id, create=True)
+                    conflict = {
+                        'id': quote_id,
+                        'baseRevision': base_revision,
+                        'revision': len(history['records'])
+                    }
+                    if history['current'] is None:
+                        conflict['deleted'] = True
+                    else:
+                        conflict['data'] = json.loads(json.dumps(history['current']))
+                    conflicts.append(conflict)
+                    skip[quote_id] = self._changes.get(quote_id)
+                
+                except QuoteNotFoundError:
+                    # Deleting a quote the server never had
+                    accepted.append({'id': quote_id, 'revision': 0, 'seq': None})
+                
+                except (ValueError, TypeError, AttributeError) as e:
+                    rejected.append({'id': quote_id, 'error': str(e)})
+            
+            result = self.changes_since(cursor, limit)
+        
+        # Clients already hold what they just uploaded or got as a conflict
+        result['changes'] = [c for c in result['changes'] if skip.get(c['id']) != c['seq']]
+        
+        logger.info(
+            'Sync: %d accepted, %d conflicts, %d rejected, %d sent',
+            len(accepted), len(conflicts), len(rejected), len(result['changes']),
+            extra={'sample': True}
+        )
+        
+        return {
+            'accepted': accepted,
+            'conflicts': conflicts,
+            'rejected': rejected,
+            **result,
+            'batchSize': limit
+        }
+    
+    def get_quote(self, quote_id: str, revision: Optional[int] = None) -> Dict[str, Any]:
+        """Get a quote, at its latest or at a given revision.
+        
+        Args:
+            quote_id: Quote id
+            revision: Revision number (latest if omitted)
+        
+        Returns:
+            Quote data
+        
+        Raises:
+            QuoteNotFoundError: If the quote or revision does not exist
+        """
+        with self._lock:
+            history = self._history(quote_id)
+            records = history['records']
+            
+            if revision is None:
+                revision = len(records)
+            
+            if revision < 1 or revision > len(records):
+                raise QuoteNotFoundError(f'Revision {revision} not found for quote {quote_id}')
+            
+            if records[revision - 1].get('deleted'):
+                raise QuoteNotFoundError(f'Quote {quote_id} was deleted at revision {revision}')
+            
+            if revision == len(records):
+                return json.loads(json.dumps(history['current']))
+            
+            # Walk back to the nearest snapshot, then replay deltas forward
+            start = revision - 1
+            while 'snapshot' not in records[start]:
+                start -= 1
+            
+            document = records[start]['snapshot']
+            for record in records[start + 1:revision]:
+                document = apply_delta(document, record['delta'])
+            
+            return json.loads(json.dumps(document))
+    
+    def list_revisions(self, quote_id: str) -> List[Dict[str, Any]]:
+        """List revision metadata for a quote.
+        
+        Args:
+            quote_id: Quote id
+        
+        Returns:
+            Revision metadata, oldest first
+        
+        Raises:
+            QuoteNotFoundError: If the quote does not exist
+        """
+        with self._lock:
+            history = self._history(quote_id)
+            return [self._revision_info(quote_id, record) for record in history['records']]
+    
+    def diff(self, quote_id: str, from_revision: Optional[int] = None,
+             to_revision: Optional[int] = None) -> Dict[str, Any]:
+        """Compute the structural diff between two revisions.
+        
+        Args:
+            quote_id: Quote id
+            from_revision: Base revision (previous to ``to_revision`` if omitted)
+            to_revision: Target revision (latest if omitted)
+        
+        Returns:
+            Dict with id, from, to and delta operations
+        
+        Raises:
+            QuoteNotFoundError: If the quote or a revision does not exist
+        """
+        with self._lock:
+            records = self._history(quote_id)['records']
+            to_revision = len(records) if to_revision is None else to_revision
+            from_revision = from_revision if from_revision is not None else max(to_revision - 1, 0)
+            
+            if not 1 <= to_revision <= len(records) or not 0 <= from_revision <= len(records):
+                raise QuoteNotFoundError(f'Revision not found for quote {quote_id}')
+            
+            if to_revision == from_revision + 1 and 'delta' in records[to_revision - 1]:
+                delta = records[to_revision - 1]['delta']
+            else:
+                old = self._get_or_empty(quote_id, from_revision)
+                delta = compute_delta(old, self._get_or_empty(quote_id, to_revision))
+        
+        return {
+            'id': quote_id,
+            'from': from_revision,
+            'to': to_revision,
+            'delta': delta
+        }
+    
+    def _history(self, quote_id: str, create: bool = False) -> Dict[str, Any]:
+        """Return the in-memory history of a quote, up to date with its file.
+        
+        Only existing quotes are cached; with ``create``, an unknown quote
+        gets an empty history that ``save_quote`` caches once saved.
+        """
+        self._check_id(quote_id)
+        
+        history = self._histories.get(quote_id) or {'records': [], 'current': None, 'offset': 0}
+        self._read_new_records(quote_id, history)
+        
+        if history['records']:
+            self._histories[quote_id] = history
+        elif not create:
+            raise QuoteNotFoundError(f'Quote {quote_id} not found')
+        
+        return history
+    
+    def _read_new_records(self, quote_id: str, history: Dict[str, Any]) -> None:
+        """Apply records appended to the quote file since it was last read.
+        
+        Other processes sharing the storage directory may have added
+        revisions; only complete lines are read.
+        """
+        path = self._path(quote_id)
+        if not path or not os.path.exists(path) or os.path.getsize(path) <= history['offset']:
+            return
+        
+        with open(path, 'rb') as f:
+            f.seek(history['offset'])
+            data = f.read()
+        
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8').splitlines():
+            if line.strip():
+                self._apply_record(history, json.loads(line))
+        history['offset'] += end
+    
+    @staticmethod
+    def _apply_record(history: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """Add a stored record to a history and update its current data."""
+        history['records'].append(record)
+        if record.get('deleted'):
+            history['current'] = None
+        elif 'snapshot' in record:
+            history['current'] = record['snapshot']
+        else:
+            history['current'] = apply_delta(history['current'], record['delta'])
+    
+    def _get_or_empty(self, quote_id: str, revision: int) -> Dict[str, Any]:
+        """Return a revision, or an empty quote for revision 0 or a deletion."""
+        if revision == 0 or self._histories[quote_id]['records'][revision - 1].get('deleted'):
+            return {}
+        return self.get_quote(quote_id, revision)
+    
+    @staticmethod
+    def _check_base_revision(quote_id: str, history: Dict[str, Any],
+                             base_revision: Optional[int]) -> None:
+        """Raise QuoteConflictError if base_revision is not the latest revision."""
+        latest = len(history['records'])
+        if base_revision is not None and base_revision != latest:
+            raise QuoteConflictError(
+                f'Quote {quote_id} is at revision {latest}, change was based on {base_revision}'
+            )
+    
+    def _next_seq(self) -> int:
+        """Allocate the next change sequence number.
+        
+        Called with the write lock held: the change log is read up to date
+        first, so every process sharing the storage hands out the number
+        after the last one logged.
+        """
+        self._read_change_log()
+        self._seq += 1
+        return self._seq
+    
+    def _log_change(self, quote_id: str, seq: int) -> None:
+        """Record that a quote changed at ``seq``."""
+        self._changes[quote_id] = seq
+        if self.storage_dir:
+            path = self._change_log_path()
+            self._truncate_torn_line(path, self._log_offset)
+            line = (json.dumps({'seq': seq, 'id': quote_id}) + '\n').encode('utf-8')
+            with open(path, 'ab') as f:
+                f.write(line)
+            self._log_offset += len(line)
+    
+    def _read_change_log(self) -> None:
+        """Update the change index with entries logged since it was last read.
+        
+        Other processes sharing the storage directory may have logged
+        changes; only complete lines are read.
+        """
+        if not self.storage_dir:
+            return
+        
+        path = self._change_log_path()
+        if not os.path.exists(path) or os.path.getsize(path) <= self._log_offset:
+            return
+        
+        with open(path, 'rb') as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8').splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                self._changes[entry['id']] = entry['seq']
+                self._seq = max(self._seq, entry['seq'])
+        self._log_offset += end
+    
+    def _log_unlogged_quotes(self) -> None:
+        """Load the change log, logging quote files missing from it.
+        
+        Quotes saved before the change log existed get new sequence numbers.
+        """
+        with self._write_lock():
+            self._read_change_log()
+            for name in sorted(os.listdir(self.storage_dir)):
+                quote_id, ext = os.path.splitext(name)
+                if ext == '.jsonl' and quote_id not in self._changes:
+                    self._log_change(quote_id, self._next_seq())
+    
+    def _change_log_path(self) -> str:
+        """Return the change log path."""
+        return os.path.join(self.storage_dir, 'changes.log')
+    
+    def _append(self, quote_id: str, history: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """Append a revision record to the quote's history and file."""
+        path = self._path(quote_id)
+        if path:
+            self._truncate_torn_line(path, history['offset'])
+            line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+            with open(path, 'ab') as f:
+                f.write(line)
+            history['offset'] += len(line)
+        history['records'].append(record)
+    
+    @staticmethod
+    def _truncate_torn_line(path: str, offset: int) -> None:
+        """Drop a partial last line left by an interrupted write.
+        
+        Called with the write lock held, after the file was read up to
+        ``offset``: anything past it is an incomplete line that no writer
+        will finish, and appending after it would corrupt the next record.
+        """
+        if os.path.exists(path) and os.path.getsize(path) > offset:
+            logger.warning('Discarding incomplete last line of %s', path)
+            os.truncate(path, offset)
+    
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """Serialize writes across threads and processes sharing the storage.
+        
+        Histories are refreshed from their files while the lock is held, so
+        a revision is always computed from, and numbered after, the latest
+        one on disk.
+        """
+        with self._lock:
+            if self._store_locked or not self.storage_dir or fcntl is None:
+                yield
+                return
+            
+            with open(os.path.join(self.storage_dir, 'store.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._store_locked = True
+                try:
+                    yield
+                finally:
+                    self._store_locked = False
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _path(self, quote_id: str) -> Optional[str]:
+        """Return the history file path for a quote, if persistence is enabled."""
+        if not self.storage_dir:
+            return None
+        return os.path.join(self.storage_dir, f'{quote_id}.jsonl')
+    
+    @staticmethod
+    def _check_id(quote_id: str) -> None:
+        """Reject ids that are not safe to use as file names."""
+        if not isinstance(quote_id, str) or not QUOTE_ID_PATTERN.match(quote_id):
+            raise ValueError(f'Invalid quote id: {quote_id}')
+    
+    @staticmethod
+    def _revision_info(quote_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Build public metadata for a revision record."""
+        if record.get('deleted'):
+            revision_type = 'deleted'
+        elif 'snapshot' in record:
+            revision_type = 'snapshot'
+        else:
+            revision_type = 'delta'
+        
+        return {
+            'id': quote_id,
+            'revision': record['revision'],
+            'timestamp': record['timestamp'],
+            'type': revision_type,
+            'changes': record['changes'],
+            'seq': record.get('seq')
+        }
+    
     @staticmethod
     def validate_quote_data(data: Dict[str, Any]) -> tuple[bool, List[str]]:
         """Validate quote data structure.
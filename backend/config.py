@@ -1,7 +1,62 @@
 """Configuration management for Flask application."""
 
 import os
-from typing import Dict, Any
+import json
+import signal
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, Callable, List, Mapping, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Settings that the settings file may change at runtime
+RELOADABLE_SETTINGS = {
+    'CLAUDE_API_KEY',
+    'CLAUDE_MODEL',
+    'CLAUDE_MAX_TOKENS',
+    'CLAUDE_USE_TOOLS',
+    'CORS_ORIGINS',
+    'RATELIMIT_ENABLED',
+    'RATELIMIT_DEFAULT',
+    'LOG_LEVEL',
+    'LOG_SLOW_REQUEST_MS',
+    'SYNC_BATCH_SIZE'
+}
+
+# Settings a tenant (brand) may override. The tenant comes from a request
+# header the client controls, so nothing that grants access (API key,
+# CORS origins) can be chosen per tenant.
+TENANT_SETTINGS = RELOADABLE_SETTINGS - {'LOG_LEVEL', 'CLAUDE_API_KEY', 'CORS_ORIGINS'}
+
+# Allowed (min, max) for numeric settings (None: unbounded)
+SETTING_BOUNDS = {
+    'CLAUDE_MAX_TOKENS': (1, None),
+    'LOG_SLOW_REQUEST_MS': (0, None),
+    'SYNC_BATCH_SIZE': (1, 1000)
+}
+
+
+def check_bounds(key: str, value: Any) -> Optional[str]:
+    """Check a numeric setting against ``SETTING_BOUNDS``.
+    
+    Args:
+        key: Setting name
+        value: Setting value
+    
+    Returns:
+        Error message, or None if the value is in range
+    """
+    low, high = SETTING_BOUNDS.get(key, (None, None))
+    if low is not None and value < low:
+        return f'{key} must be >= {low}'
+    if high is not None and value > high:
+        return f'{key} must be <= {high}'
+    return None
 
 
 class Config:
@@ -20,7 +75,8 @@ class Config:
     CLAUDE_MODEL = os.getenv('CLAUDE_MODEL', 'claude-sonnet-4-20250514')
     CLAUDE_MAX_TOKENS = int(os.getenv('CLAUDE_MAX_TOKENS', 1000))
     CLAUDE_API_URL = 'https://api.anthropic.com/v1/messages'
-    
+    CLAUDE_USE_TOOLS = os.getenv('CLAUDE_USE_TOOLS', 'True').lower() == 'true'
+
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5000,http://127.0.0.1:5000').split(',')
     
@@ -32,9 +88,26 @@ class Config:
     CACHE_TYPE = os.getenv('CACHE_TYPE', 'simple')
     CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300))
     
+    # Venue catalog precomputation
+    VENUE_CACHE_FILE = os.getenv('VENUE_CACHE_FILE', os.path.join(PROJECT_ROOT, 'data', 'venue_texts.json'))
+    PRECOMPUTE_WORKERS = int(os.getenv('PRECOMPUTE_WORKERS', 4))
+    
+    # Quote revision history
+    QUOTE_STORAGE_DIR = os.getenv('QUOTE_STORAGE_DIR', os.path.join(PROJECT_ROOT, 'data', 'quotes'))
+    QUOTE_SNAPSHOT_INTERVAL = int(os.getenv('QUOTE_SNAPSHOT_INTERVAL', 20))
+    SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', 50))
+    
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    LOG_FORMAT = os.getenv('LOG_FORMAT', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s')
+    LOG_JSON = os.getenv('LOG_JSON', 'False').lower() == 'true'
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1.0))
+    LOG_MAX_FIELD_LENGTH = int(os.getenv('LOG_MAX_FIELD_LENGTH', 2000))
+    LOG_SLOW_REQUEST_MS = int(os.getenv('LOG_SLOW_REQUEST_MS', 5000))
+    
+    # Runtime settings file (hot reloaded)
+    CONFIG_FILE = os.getenv('CONFIG_FILE', os.path.join(PROJECT_ROOT, 'settings.json'))
+    CONFIG_WATCH_INTERVAL = float(os.getenv('CONFIG_WATCH_INTERVAL', 5))
     
     @classmethod
     def validate(cls) -> Dict[str, Any]:
@@ -52,6 +125,11 @@ class Config:
         if cls.SECRET_KEY == 'dev-secret-key-change-in-production' and not cls.DEBUG:
             warnings.append('SECRET_KEY should be changed in production')
         
+        for key in SETTING_BOUNDS:
+            error = check_bounds(key, getattr(cls, key))
+            if error:
+                issues.append(error)
+        
         return {
             'valid': len(issues) == 0,
             'issues': issues,
@@ -70,10 +148,13 @@ class Config:
             'host': cls.HOST,
             'port': cls.PORT,
             'claude_model': cls.CLAUDE_MODEL,
+            'claude_use_tools': cls.CLAUDE_USE_TOOLS,
             'cors_origins': cls.CORS_ORIGINS,
             'ratelimit_enabled': cls.RATELIMIT_ENABLED,
             'cache_type': cls.CACHE_TYPE,
-            'log_level': cls.LOG_LEVEL
+            'log_level': cls.LOG_LEVEL,
+            'log_json': cls.LOG_JSON,
+            'log_sample_rate': cls.LOG_SAMPLE_RATE
         }
 
 
@@ -88,6 +169,8 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     RATELIMIT_ENABLED = True
+    LOG_JSON = os.getenv('LOG_JSON', 'True').lower() == 'true'
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.1))
 
 
 class TestingConfig(Config):
@@ -117,3 +200,264 @@ def get_config(env: str = None) -> Config:
     """
     env = env or os.getenv('FLASK_ENV', 'development')
     return config_by_name.get(env, DevelopmentConfig)
+
+
+
+class ConfigSnapshot(NamedTuple):
+    """Immutable view of the active configuration.
+    
+    ``base`` and each tenant entry are ``Config`` subclasses with the file
+    settings applied, so they can be passed anywhere a config class is used.
+    """
+    version: int
+    checksum: str
+    loaded_at: str
+    source: Optional[str]
+    base: type
+    tenants: Mapping[str, type]
+    
+    def for_tenant(self, tenant: Optional[str] = None) -> type:
+        """Return the configuration for a tenant (base config if unknown)."""
+        if tenant:
+            return self.tenants.get(tenant, self.base)
+        return self.base
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Describe the snapshot (for /health)."""
+        return {
+            'version': self.version,
+            'checksum': self.checksum,
+            'loaded_at': self.loaded_at,
+            'source': self.source,
+            'tenants': sorted(self.tenants)
+        }
+
+
+def apply_settings(base: type, settings: Dict[str, Any], allowed: set, name: str) -> type:
+    """Build a config class with settings applied on top of ``base``.
+    
+    Args:
+        base: Configuration class
+        settings: Setting name to value
+        allowed: Setting names that may be changed
+        name: Name of the new class
+    
+    Returns:
+        Configuration subclass (``base`` itself if there are no settings)
+    
+    Raises:
+        ValueError: If a setting is unknown, not allowed, has the wrong type
+            or is out of range
+    """
+    if not isinstance(settings, dict):
+        raise ValueError(f'{name}: settings must be an object')
+    
+    if not settings:
+        return base
+    
+    attrs = {}
+    for key, value in settings.items():
+        if key not in allowed:
+            raise ValueError(f'{name}: {key} cannot be set at runtime')
+        
+        current = getattr(base, key)
+        if isinstance(current, list):
+            if isinstance(value, str):
+                value = value.split(',')
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                raise ValueError(f'{name}: {key} must be a list of strings')
+        elif isinstance(current, bool):
+            if not isinstance(value, bool):
+                raise ValueError(f'{name}: {key} must be a boolean')
+        elif isinstance(current, (int, float)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f'{name}: {key} must be a number')
+            value = type(current)(value)
+            error = check_bounds(key, value)
+            if error:
+                raise ValueError(f'{name}: {error}')
+        elif not isinstance(value, str):
+            raise ValueError(f'{name}: {key} must be a string')
+        
+        if key == 'LOG_LEVEL' and not isinstance(logging.getLevelName(value), int):
+            raise ValueError(f'{name}: unknown LOG_LEVEL {value}')
+        
+        attrs[key] = value
+    
+    return type(name, (base,), attrs)
+
+
+class ConfigStore:
+    """Hot-reloadable configuration with per-tenant overrides.
+    
+    Environment variables (the ``Config`` classes) are the base layer. An
+    optional JSON settings file overrides reloadable settings globally and
+    per tenant (brand):
+    
+        {
+            "settings": {"CLAUDE_MODEL": "...", "CORS_ORIGINS": ["..."]},
+            "tenants": {"ldr": {"CLAUDE_MAX_TOKENS": 1200}}
+        }
+    
+    Each reload builds a new immutable ``ConfigSnapshot`` and swaps it in
+    with a single assignment, so readers never take a lock and an in-flight
+    request keeps the snapshot it started with. A file that fails to parse
+    or validate is ignored and the previous snapshot stays active.
+    """
+    
+    def __init__(self, base: type, path: Optional[str] = None):
+        self.base = base
+        self.path = path
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[ConfigSnapshot], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._mtime: Optional[float] = None
+        self._snapshot = ConfigSnapshot(
+            version=0,
+            checksum='',
+            loaded_at=datetime.now().isoformat(),
+            source=None,
+            base=base,
+            tenants=MappingProxyType({})
+        )
+        self.reload()
+    
+    @property
+    def current(self) -> ConfigSnapshot:
+        """The active snapshot (lock-free read)."""
+        return self._snapshot
+    
+    def get(self, tenant: Optional[str] = None) -> type:
+        """Return the active configuration class for a tenant."""
+        return self._snapshot.for_tenant(tenant)
+    
+    def add_listener(self, callback: Callable[[ConfigSnapshot], None]) -> None:
+        """Call ``callback(snapshot)`` after every successful reload."""
+        self._listeners.append(callback)
+    
+    def reload(self) -> bool:
+        """Reload the settings file if its content changed.
+        
+        Returns:
+            True if a new snapshot was activated
+        """
+        with self._lock:
+            try:
+                raw = self._read()
+            except OSError as e:
+                logger.error('Failed to read settings file %s: %s', self.path, e)
+                return False
+            
+            checksum = hashlib.sha256(raw.encode('utf-8')).hexdigest()[:12] if raw else ''
+            if checksum == self._snapshot.checksum:
+                return False
+            
+            try:
+                snapshot = self._build(raw, checksum)
+            except ValueError as e:
+                logger.error('Invalid settings file %s, keeping version %d: %s',
+                             self.path, self._snapshot.version, e)
+                return False
+            
+            self._snapshot = snapshot
+        
+        logger.info('Configuration version %d active (%d tenants, checksum %s)',
+                    snapshot.version, len(snapshot.tenants), checksum or 'none')
+        
+        for warning in snapshot.base.validate()['warnings']:
+            logger.warning('Configuration warning: %s', warning)
+        
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.exception('Configuration listener failed: %s', e)
+        
+        return True
+    
+    def watch(self, interval: float) -> None:
+        """Poll the settings file for changes in a background thread.
+        
+        Args:
+            interval: Seconds between checks (0 disables watching)
+        """
+        if not self.path or interval <= 0 or self._watcher is not None:
+            return
+        
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    mtime = os.stat(self.path).st_mtime
+                except OSError:
+                    mtime = None
+                if mtime != self._mtime:
+                    self.reload()
+        
+        self._watcher = threading.Thread(target=run, name='config-watcher', daemon=True)
+        self._watcher.start()
+    
+    def install_signal_handler(self) -> bool:
+        """Reload on SIGHUP (where available, from the main thread).
+        
+        Returns:
+            True if the handler was installed
+        """
+        if not hasattr(signal, 'SIGHUP'):
+            return False
+        
+        def handler(signum, frame):
+            # Reload outside the signal handler to avoid re-entrancy on the lock
+            threading.Thread(target=self.reload, name='config-reload', daemon=True).start()
+        
+        try:
+            signal.signal(signal.SIGHUP, handler)
+        except ValueError:
+            # Not in the main thread
+            return False
+        return True
+    
+    def stop(self) -> None:
+        """Stop the file watcher."""
+        self._stop.set()
+    
+    def _read(self) -> str:
+        """Read the settings file ('' if there is none)."""
+        if not self.path or not os.path.exists(self.path):
+            self._mtime = None
+            return ''
+        
+        self._mtime = os.stat(self.path).st_mtime
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+    
+    def _build(self, raw: str, checksum: str) -> ConfigSnapshot:
+        """Parse and validate settings into a new snapshot."""
+        try:
+            data = json.loads(raw) if raw.strip() else {}
+        except json.JSONDecodeError as e:
+            raise ValueError(f'invalid JSON: {str(e)}')
+        
+        if not isinstance(data, dict):
+            raise ValueError('settings file must contain an object')
+        
+        base = apply_settings(self.base, data.get('settings', {}), RELOADABLE_SETTINGS,
+                              f'{self.base.__name__}Runtime')
+        
+        tenants = data.get('tenants', {})
+        if not isinstance(tenants, dict):
+            raise ValueError('tenants must be an object')
+        
+        tenant_configs = {
+            str(tenant): apply_settings(base, overrides, TENANT_SETTINGS, f'{base.__name__}_{tenant}')
+            for tenant, overrides in tenants.items()
+        }
+        
+        return ConfigSnapshot(
+            version=self._snapshot.version + 1,
+            checksum=checksum,
+            loaded_at=datetime.now().isoformat(),
+            source=self.path if raw else None,
+            base=base,
+            tenants=MappingProxyType(tenant_configs)
+        )
@@ -0,0 +1,159 @@
+"""Precompute venue texts from the Les Domaines Rares catalog.
+
+Reads a CSV or JSON venue catalog, generates the commercial texts for every
+venue whose data or prompt version changed since the last run, and writes
+them to the generation cache file loaded by the server at start.
+
+Usage (from the project root):
+    python -m backend.precompute venues.csv
+    python -m backend.precompute venues.json --workers 2 --force
+"""
+
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import modules
+from .config import ConfigStore, get_config
+from .api.ai_generator import generate_with_ai, get_prompt_version, AIGenerationError
+from .api.generation_cache import GenerationCache, load_catalog
+from .utils.structured_logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Progress is saved every SAVE_EVERY venues or SAVE_INTERVAL seconds; each
+# save makes a running server reload the cache file
+SAVE_EVERY = 20
+SAVE_INTERVAL = 30.0
+
+
+def precompute(catalog_path: str, output_path: str, workers: int,
+               force: bool = False, prune: bool = False, configs=None) -> dict:
+    """Generate texts for new or changed catalog venues.
+
+    Texts are generated once per distinct prompt version among ``configs``
+    (e.g. the global settings and each tenant's), so every configuration
+    the server runs with is served from the cache.
+
+    Args:
+        catalog_path: CSV or JSON venue catalog
+        output_path: Generation cache file to update
+        workers: Maximum number of concurrent Claude API calls
+        force: Regenerate every venue, even if up to date
+        prune: Remove cached venues missing from the catalog, and texts
+            for prompt versions no longer in use
+        configs: Configuration classes (defaults to the environment's)
+
+    Returns:
+        Run statistics (total, versions, skipped, generated, failed, pruned)
+    """
+    configs = configs or [get_config()]
+    versions = {get_prompt_version(config): config for config in configs}
+    venues = load_catalog(catalog_path)
+
+    cache = GenerationCache()
+    cache.load(output_path)
+
+    pending = [
+        (venue, version)
+        for version in versions
+        for venue in venues
+        if force or not cache.is_fresh(venue, version)
+    ]
+    logger.info('%d venues in catalog, %d prompt versions, %d texts to generate',
+                len(venues), len(versions), len(pending))
+
+    generated = 0
+    failed = []
+    unsaved = 0
+    last_save = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(generate_with_ai, venue['titre'], venue['adresse'], versions[version],
+                            f'precompute-{venue["id"]}'): (venue, version)
+            for venue, version in pending
+        }
+        for future in as_completed(futures):
+            venue, version = futures[future]
+            try:
+                result = future.result()
+            except AIGenerationError as e:
+                failed.append(venue['id'])
+                logger.error('Generation failed for %s: %s', venue['titre'], e)
+                continue
+            except Exception:
+                # One bad venue must not stop the rest of the catalog
+                failed.append(venue['id'])
+                logger.exception('Unexpected error generating %s', venue['titre'])
+                continue
+
+            cache.put(venue, result, version)
+            generated += 1
+            logger.info('Generated texts for: %s', venue['titre'])
+
+            # Save as we go so an interrupted run keeps finished venues
+            unsaved += 1
+            if unsaved >= SAVE_EVERY or time.monotonic() - last_save >= SAVE_INTERVAL:
+                cache.save(output_path)
+                unsaved = 0
+                last_save = time.monotonic()
+
+    pruned = cache.prune([venue['id'] for venue in venues], list(versions)) if prune else []
+    cache.save(output_path)
+
+    return {
+        'total': len(venues),
+        'versions': len(versions),
+        'skipped': len(venues) * len(versions) - len(pending),
+        'generated': generated,
+        'failed': sorted(set(failed)),
+        'pruned': pruned
+    }
+
+
+def main(argv=None) -> int:
+    """Command-line entry point."""
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description='Précalcul des textes IA du catalogue de lieux')
+    parser.add_argument('catalog', help='Catalogue des lieux (.csv ou .json)')
+    parser.add_argument('--output', default=config.VENUE_CACHE_FILE,
+                        help='Fichier de cache généré (défaut: %(default)s)')
+    parser.add_argument('--workers', type=int, default=config.PRECOMPUTE_WORKERS,
+                        help='Appels IA simultanés (défaut: %(default)s)')
+    parser.add_argument('--force', action='store_true',
+                        help='Régénérer tous les lieux')
+    parser.add_argument('--prune', action='store_true',
+                        help='Supprimer du cache les lieux absents du catalogue '
+                             'et les versions du prompt inutilisées')
+    args = parser.parse_args(argv)
+
+    setup_logging(config)
+
+    # Generate for the runtime settings the server uses, global and per tenant
+    snapshot = ConfigStore(config, config.CONFIG_FILE).current
+    configs = [snapshot.base, *snapshot.tenants.values()]
+
+    try:
+        stats = precompute(args.catalog, args.output, args.workers,
+                           force=args.force, prune=args.prune, configs=configs)
+    except (OSError, ValueError) as e:
+        logger.error('Failed to read catalog: %s', e)
+        return 1
+
+    print(f"✅ {stats['generated']} générés, {stats['skipped']} à jour, "
+          f"{len(stats['failed'])} échecs, {len(stats['pruned'])} supprimés "
+          f"({stats['total']} lieux, {stats['versions']} versions du prompt)")
+
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,18 +9,26 @@ Improved version with:
 """
 
 import os
+import re
+import json
+import time
 import logging
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 # Import modules
-from config import Config, get_config
-from api.ai_generator import generate_with_ai, AIGenerationError
-from api.quotes import QuoteManager
+from config import Config, ConfigStore, get_config
+from api.ai_generator import (
+    generate_with_ai, stream_generate_with_ai, get_prompt_version, AIGenerationError, STREAM_RESET
+)
+from api.generation_cache import GenerationCache
+from api.quotes import QuoteManager, QuoteNotFoundError
+from utils.structured_logging import (
+    setup_logging, request_context, set_request_id, get_request_id, new_request_id
+)
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
@@ -29,28 +37,143 @@ app = Flask(__name__, static_folder='../frontend', static_url_path='')
 config_class = get_config()
 app.config.from_object(config_class)
 
-# Configure CORS
-CORS(app, origins=config_class.CORS_ORIGINS)
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, config_class.LOG_LEVEL),
-    format=config_class.LOG_FORMAT
-)
+# Configure logging (non-blocking, written by a background thread)
+setup_logging(config_class)
 logger = logging.getLogger(__name__)
 
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+
 # Validate configuration
 config_validation = Config.validate()
 if not config_validation['valid']:
     logger.error('Configuration validation failed:')
     for issue in config_validation['issues']:
-        logger.error(f'  - {issue}')
+        logger.error('  - %s', issue)
     # Don't exit, but warn
     
 if config_validation['warnings']:
     logger.warning('Configuration warnings:')
     for warning in config_validation['warnings']:
-        logger.warning(f'  - {warning}')
+        logger.warning('  - %s', warning)
+
+# Runtime configuration: settings file with per-tenant overrides, reloaded
+# on change or SIGHUP without restarting (caches and in-flight requests are kept)
+config_store = ConfigStore(config_class, Config.CONFIG_FILE)
+
+
+def apply_log_level(snapshot):
+    """Apply the LOG_LEVEL of a configuration snapshot."""
+    logging.getLogger().setLevel(getattr(logging, snapshot.base.LOG_LEVEL))
+
+
+apply_log_level(config_store.current)
+config_store.add_listener(apply_log_level)
+config_store.watch(Config.CONFIG_WATCH_INTERVAL)
+config_store.install_signal_handler()
+
+# Warm the generation cache with precomputed venue texts (every prompt
+# version, so tenants and reloaded models are served), and pick up new
+# precompute runs without restarting
+generation_cache = GenerationCache(get_prompt_version(config_store.current.base))
+generation_cache.load(Config.VENUE_CACHE_FILE)
+generation_cache.watch(Config.VENUE_CACHE_FILE, Config.CONFIG_WATCH_INTERVAL)
+
+# Quote revision history
+quote_manager = QuoteManager(Config.QUOTE_STORAGE_DIR, Config.QUOTE_SNAPSHOT_INTERVAL)
+
+CORS_ALLOW_METHODS = 'GET, POST, PUT, DELETE, OPTIONS'
+
+
+@app.before_request
+def start_request():
+    """Assign a request id (reusing a valid X-Request-ID header) and start timing."""
+    request_id = request.headers.get('X-Request-ID', '')
+    if not REQUEST_ID_PATTERN.match(request_id):
+        request_id = new_request_id()
+    
+    set_request_id(request_id)
+    g.request_started = time.perf_counter()
+    
+    # One configuration snapshot for the whole request
+    g.config = config_store.get(request.headers.get('X-Tenant-ID'))
+
+
+
+@app.after_request
+def finish_request(response):
+    """Add CORS headers, return the request id and log the request.
+    
+    Requests are always logged if they were slow.
+    """
+    cfg = g.get('config', config_class)
+    apply_cors(response, cfg)
+    
+    request_id = get_request_id()
+    if request_id:
+        response.headers['X-Request-ID'] = request_id
+    
+    started = g.get('request_started')
+    if started is not None:
+        duration_ms = round((time.perf_counter() - started) * 1000)
+        extra = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': duration_ms
+        }
+        
+        if duration_ms >= cfg.LOG_SLOW_REQUEST_MS:
+            logger.warning('Slow request %s %s: %d ms', request.method, request.path, duration_ms, extra=extra)
+        else:
+            logger.info('%s %s %d in %d ms', request.method, request.path, response.status_code,
+                        duration_ms, extra={**extra, 'sample': True})
+    
+    return response
+
+
+def apply_cors(response, cfg) -> None:
+    """Allow the request's origin if it is in the active CORS_ORIGINS."""
+    origin = request.headers.get('Origin')
+    if not origin:
+        return
+    
+    response.headers.add('Vary', 'Origin')
+    if origin not in cfg.CORS_ORIGINS and '*' not in cfg.CORS_ORIGINS:
+        return
+    
+    response.headers['Access-Control-Allow-Origin'] = origin
+    response.headers['Access-Control-Expose-Headers'] = 'X-Request-ID'
+    
+    if request.method == 'OPTIONS':
+        response.headers['Access-Control-Allow-Methods'] = CORS_ALLOW_METHODS
+        requested_headers = request.headers.get('Access-Control-Request-Headers')
+        if requested_headers:
+            response.headers['Access-Control-Allow-Headers'] = requested_headers
+
+
+def venue_params():
+    """Read and validate ``titre`` and ``adresse`` from the JSON body.
+    
+    Raises:
+        ValueError: If the body is not a JSON object or a field is missing
+    """
+    if not request.is_json or not isinstance(request.json, dict):
+        raise ValueError('Request must be a JSON object')
+    
+    data = request.json
+    titre = data.get('titre') or ''
+    adresse = data.get('adresse') or ''
+    if not isinstance(titre, str) or not isinstance(adresse, str):
+        raise ValueError('Titre and adresse must be strings')
+    
+    titre, adresse = titre.strip(), adresse.strip()
+    if not titre:
+        raise ValueError('Titre is required')
+    
+    if not adresse:
+        raise ValueError('Adresse is required')
+    
+    return titre, adresse
 
 
 @app.route('/')
@@ -59,7 +182,7 @@ def index():
     try:
         return send_from_directory(app.static_folder, 'index.html')
     except Exception as e:
-        logger.error(f'Error serving index: {str(e)}')
+        logger.error('Error serving index: %s', e)
         return jsonify({'error': 'Failed to load application'}), 500
 
 
@@ -69,7 +192,13 @@ def health():
     return jsonify({
         'status': 'healthy',
         'version': '2.0.0',
-        'config': Config.to_dict()
+        'config': g.config.to_dict(),
+        'config_version': config_store.current.to_dict(),
+        'generation_cache': {
+            'entries': len(generation_cache),
+            'prompt_version': get_prompt_version(g.config),
+            'prompt_versions': generation_cache.prompt_versions
+        }
     }), 200
 
 
@@ -90,41 +219,91 @@ def generate():
         }
     """
     try:
-        # Validate request
-        if not request.is_json:
-            return jsonify({'error': 'Request must be JSON'}), 400
-        
-        data = request.json
-        
-        # Extract parameters
-        titre = data.get('titre', '').strip()
-        adresse = data.get('adresse', '').strip()
-        
-        # Validate inputs
-        if not titre:
-            return jsonify({'error': 'Titre is required'}), 400
-        
-        if not adresse:
-            return jsonify({'error': 'Adresse is required'}), 400
+        titre, adresse = venue_params()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        # Precomputed catalog venues are served without calling the API
+        cached = generation_cache.get(titre, adresse, get_prompt_version(g.config))
+        if cached is not None:
+            logger.info('Serving cached content for: %s', titre, extra={'sample': True})
+            return jsonify(cached), 200
         
-        logger.info(f'Generating content for: {titre}')
+        logger.info('Generating content for: %s', titre, extra={'sample': True})
         
         # Generate with AI
-        result = generate_with_ai(titre, adresse, Config)
+        result = generate_with_ai(titre, adresse, g.config, request_id=get_request_id())
         
-        logger.info(f'Successfully generated content for: {titre}')
+        logger.info('Successfully generated content for: %s', titre, extra={'sample': True})
         
         return jsonify(result), 200
         
     except AIGenerationError as e:
-        logger.error(f'AI generation error: {str(e)}')
+        logger.error('AI generation error: %s', e)
         return jsonify({'error': str(e)}), 500
     
     except Exception as e:
-        logger.exception(f'Unexpected error in /api/generate: {str(e)}')
+        logger.exception('Unexpected error in /api/generate: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
+@app.route('/api/generate/stream', methods=['POST'])
+def generate_stream():
+    """Generate commercial texts with AI, streamed as server-sent events.
+    
+    Request body:
+        {
+            "titre": "Venue title",
+            "adresse": "Venue address"
+        }
+    
+    Returns:
+        text/event-stream with one ``field`` event per completed text
+        ({"field": ..., "text": ...}), then a ``done`` or ``error`` event.
+        A ``reset`` event voids the fields received so far.
+    """
+    try:
+        titre, adresse = venue_params()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def sse(event: str, payload: dict) -> str:
+        return f'event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n'
+    
+    request_id = get_request_id()
+    cfg = g.config
+    
+    def events():
+        # The body is streamed after the request returns: restore its id
+        with request_context(request_id):
+            cached = generation_cache.get(titre, adresse, get_prompt_version(cfg))
+            if cached is not None:
+                logger.info('Serving cached content for: %s', titre, extra={'sample': True})
+                for field, text in cached.items():
+                    yield sse('field', {'field': field, 'text': text})
+                yield sse('done', {'cached': True})
+                return
+            
+            logger.info('Streaming content for: %s', titre, extra={'sample': True})
+            try:
+                for field, text in stream_generate_with_ai(titre, adresse, cfg):
+                    if field == STREAM_RESET:
+                        yield sse('reset', {})
+                        continue
+                    yield sse('field', {'field': field, 'text': text})
+                logger.info('Successfully streamed content for: %s', titre, extra={'sample': True})
+                yield sse('done', {})
+            except AIGenerationError as e:
+                logger.error('AI generation error: %s', e)
+                yield sse('error', {'error': str(e)})
+            except Exception as e:
+                logger.exception('Unexpected error in /api/generate/stream: %s', e)
+                yield sse('error', {'error': 'Internal server error'})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream')
+
+
 @app.route('/api/validate-quote', methods=['POST'])
 def validate_quote():
     """Validate quote data structure.
@@ -167,7 +346,177 @@ def validate_quote():
             }), 400
             
     except Exception as e:
-        logger.exception(f'Error in /api/validate-quote: {str(e)}')
+        logger.exception('Error in /api/validate-quote: %s', e)
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/quotes', methods=['POST'])
+@app.route('/api/quotes/<quote_id>', methods=['PUT'])
+def save_quote(quote_id=None):
+    """Save a quote as a new revision.
+    
+    POST creates a new quote; PUT saves a revision of ``quote_id`` (creating
+    it if unknown). Unchanged data does not create a revision.
+    
+    Request body:
+        {
+            Complete quote data object
+        }
+    
+    Returns:
+        {
+            "id": "Quote id",
+            "revision": 3,
+            "timestamp": "2025-01-15T10:30:00",
+            "type": "delta",
+            "changes": 2
+        }
+    """
+    try:
+        if not request.is_json or not isinstance(request.json, dict):
+            return jsonify({'error': 'Request must be a JSON object'}), 400
+        
+        data = QuoteManager.sanitize_quote_data(request.json)
+        info = quote_manager.save_quote(data, quote_id)
+        
+        return jsonify(info), 201 if quote_id is None else 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        logger.exception('Error saving quote: %s', e)
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/quotes/<quote_id>', methods=['GET'])
+def get_quote(quote_id):
+    """Get a quote at its latest revision, or at ``?revision=n``."""
+    try:
+        revision = request.args.get('revision', type=int)
+        return jsonify(quote_manager.get_quote(quote_id, revision)), 200
+    
+    except QuoteNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        logger.exception('Error loading quote %s: %s', quote_id, e)
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/quotes/<quote_id>', methods=['DELETE'])
+def delete_quote(quote_id):
+    """Delete a quote (its earlier revisions stay readable)."""
+    try:
+        return jsonify(quote_manager.delete_quote(quote_id)), 200
+    
+    except QuoteNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        logger.exception('Error deleting quote %s: %s', quote_id, e)
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/quotes/<quote_id>/revisions', methods=['GET'])
+def list_quote_revisions(quote_id):
+    """List the revisions of a quote."""
+    try:
+        return jsonify({
+            'id': quote_id,
+            'revisions': quote_manager.list_revisions(quote_id)
+        }), 200
+    
+    except QuoteNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        logger.exception('Error listing revisions of %s: %s', quote_id, e)
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/quotes/<quote_id>/diff', methods=['GET'])
+def diff_quote(quote_id):
+    """Diff two revisions of a quote.
+    
+    Query parameters:
+        from: Base revision (default: previous to ``to``; 0 diffs from empty)
+        to: Target revision (default: latest)
+    
+    Returns:
+        {
+            "id": "Quote id",
+            "from": 2,
+            "to": 3,
+            "delta": [["set", ["markup"], 20]]
+        }
+    """
+    try:
+        from_revision = request.args.get('from', type=int)
+        to_revision = request.args.get('to', type=int)
+        return jsonify(quote_manager.diff(quote_id, from_revision, to_revision)), 200
+    
+    except QuoteNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        logger.exception('Error diffing quote %s: %s', quote_id, e)
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/sync', methods=['POST'])
+def sync_quotes():
+    """Exchange quote changes with an offline client.
+    
+    Request body:
+        {
+            "cursor": 42,
+            "changes": [
+                {"id": "Quote id", "baseRevision": 3, "data": {...}},
+                {"id": "Quote id", "baseRevision": 5, "deleted": true}
+            ]
+        }
+    
+    Returns:
+        {
+            "accepted": [{"id": ..., "revision": 4, "seq": 43}],
+            "conflicts": [{"id": ..., "baseRevision": 5, "revision": 6, "data": {...}}],
+            "rejected": [{"id": ..., "error": "..."}],
+            "changes": [{"id": ..., "revision": 2, "seq": 44, "timestamp": ..., "data": {...}}],
+            "cursor": 44,
+            "hasMore": false,
+            "batchSize": 50
+        }
+    """
+    try:
+        if not request.is_json or not isinstance(request.json, dict):
+            return jsonify({'error': 'Request must be a JSON object'}), 400
+        
+        data = request.json
+        cursor = data.get('cursor') or 0
+        if not isinstance(cursor, int) or cursor < 0:
+            return jsonify({'error': 'cursor must be a non-negative integer'}), 400
+        
+        result = quote_manager.sync(data.get('changes', []), cursor, g.config.SYNC_BATCH_SIZE)
+        return jsonify(result), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        logger.exception('Error in /api/sync: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -180,7 +529,7 @@ def not_found(error):
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
-    logger.error(f'Internal server error: {str(error)}')
+    logger.error('Internal server error: %s', error)
     return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -200,7 +549,11 @@ def print_startup_banner():
     print(f"     GET  /               - Interface principale")
     print(f"     GET  /health         - Health check")
     print(f"     POST /api/generate   - Génération IA")
+    print(f"     POST /api/generate/stream - Génération IA (flux SSE)")
     print(f"     POST /api/validate-quote - Validation devis")
+    print(f"     POST /api/quotes     - Enregistrer un devis")
+    print(f"     GET  /api/quotes/<id>/diff - Différences entre révisions")
+    print(f"     POST /api/sync       - Synchronisation hors ligne")
     print("")
     print("  💡 Pour arrêter : Appuyez sur Ctrl+C")
     print("")
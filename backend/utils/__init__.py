@@ -1,5 +1,17 @@
 """Utilities package."""
 
 from .validators import validate_email, validate_phone, format_phone
+from .json_stream import IncrementalJSONExtractor, extract_json_object
+from .structured_logging import setup_logging, request_context, get_request_id, truncate
 
-__all__ = ['validate_email', 'validate_phone', 'format_phone']
+__all__ = [
+    'validate_email',
+    'validate_phone',
+    'format_phone',
+    'IncrementalJSONExtractor',
+    'extract_json_object',
+    'setup_logging',
+    'request_context',
+    'get_request_id',
+    'truncate'
+]
@@ -0,0 +1,119 @@
+"""Structural deltas between JSON documents.
+
+A delta is a list of operations, each addressing a value by its path (a list
+of dict keys and list indices):
+
+- ``['set', path, value]``: set or add the value at path
+- ``['del', path]``: remove a dict key
+- ``['trunc', path, length]``: shorten the list at path
+
+Only changed values are recorded, so a delta grows with the size of the
+change rather than with the size of the document.
+"""
+
+import copy
+from typing import Any, List
+
+Delta = List[list]
+
+
+def compute_delta(old: Any, new: Any, path: List[Any] = None) -> Delta:
+    """Compute the operations turning ``old`` into ``new``.
+
+    Args:
+        old: Previous document
+        new: Updated document
+        path: Path of the documents within the root (internal)
+
+    Returns:
+        List of delta operations (empty if equal)
+    """
+    path = path or []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: Delta = []
+        for key in old:
+            if key not in new:
+                ops.append(['del', path + [key]])
+        for key, value in new.items():
+            if key not in old:
+                ops.append(['set', path + [key], copy.deepcopy(value)])
+            else:
+                ops.extend(compute_delta(old[key], value, path + [key]))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for idx in range(common):
+            ops.extend(compute_delta(old[idx], new[idx], path + [idx]))
+        if len(new) < len(old):
+            ops.append(['trunc', path, len(new)])
+        for idx in range(common, len(new)):
+            ops.append(['set', path + [idx], copy.deepcopy(new[idx])])
+        return ops
+
+    if type(old) is not type(new) or old != new:
+        return [['set', path, copy.deepcopy(new)]]
+
+    return []
+
+
+def apply_delta(document: Any, delta: Delta) -> Any:
+    """Apply delta operations to a document.
+
+    Args:
+        document: Document to update (not modified)
+        delta: Operations from ``compute_delta``
+
+    Returns:
+        Updated copy of the document
+
+    Raises:
+        ValueError: If an operation does not match the document
+    """
+    result = copy.deepcopy(document)
+
+    for op in delta:
+        kind, path = op[0], op[1]
+
+        if kind == 'set' and not path:
+            result = copy.deepcopy(op[2])
+            continue
+
+        target = _resolve(result, path if kind == 'trunc' else path[:-1])
+
+        if kind == 'set':
+            key = path[-1]
+            if isinstance(target, list) and key == len(target):
+                target.append(copy.deepcopy(op[2]))
+            elif isinstance(target, (dict, list)):
+                try:
+                    target[key] = copy.deepcopy(op[2])
+                except (IndexError, TypeError) as e:
+                    raise ValueError(f'Cannot set {path}: {str(e)}')
+            else:
+                raise ValueError(f'Cannot set {path}: parent is not a container')
+        elif kind == 'del':
+            if not isinstance(target, dict) or path[-1] not in target:
+                raise ValueError(f'Cannot delete {path}')
+            del target[path[-1]]
+        elif kind == 'trunc':
+            if not isinstance(target, list):
+                raise ValueError(f'Cannot truncate {path}: not a list')
+            del target[op[2]:]
+        else:
+            raise ValueError(f'Unknown delta operation: {kind}')
+
+    return result
+
+
+def _resolve(document: Any, path: List[Any]) -> Any:
+    """Return the value at path, raising ValueError if it does not exist."""
+    node = document
+    for key in path:
+        try:
+            node = node[key]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f'Invalid delta path: {path}')
+    return node
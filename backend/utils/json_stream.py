@@ -0,0 +1,212 @@
+"""Incremental JSON extraction utilities.
+
+Model output is not always a clean JSON document: it may be wrapped in
+Markdown fences or surrounded by prose. These helpers locate the first
+balanced JSON object in such text, and can do so incrementally while the
+output is still being streamed.
+"""
+
+import json
+from typing import Dict, Any, Optional
+
+
+class IncrementalJSONExtractor:
+    """Scan streamed text for the first balanced JSON object.
+
+    Text is fed chunk by chunk. Every top-level member of the object is
+    decoded as soon as its value is complete, so callers can use a field
+    before the rest of the output has arrived.
+
+    A ``{`` that does not start a JSON object (e.g. a brace in prose) is
+    abandoned and scanning resumes after it. Members are checked as they
+    complete, so most bogus candidates are dropped before any field is
+    returned. If fields were already returned from a candidate abandoned
+    later, ``resets`` is incremented: callers must discard those fields.
+
+    Example:
+        extractor = IncrementalJSONExtractor()
+        for chunk in chunks:
+            for key, value in extractor.feed(chunk).items():
+                ...
+        extractor.finish()
+        result = extractor.result
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._member_start = 0
+        self._expect_key = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.fields: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.resets = 0
+
+    @property
+    def complete(self) -> bool:
+        """Whether a full JSON object has been extracted."""
+        return self.result is not None
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """Consume a chunk of text.
+
+        Args:
+            chunk: Next piece of the model output
+
+        Returns:
+            Top-level fields completed by this chunk
+        """
+        if self.complete or not chunk:
+            return {}
+
+        self._buffer += chunk
+        new_fields: Dict[str, Any] = {}
+        self._scan(new_fields)
+        return new_fields
+
+    def finish(self) -> Dict[str, Any]:
+        """Signal the end of the text.
+
+        A candidate object that never closed is abandoned and the text is
+        rescanned after its opening brace, so an unmatched ``{`` does not
+        hide a later object.
+
+        Returns:
+            Top-level fields completed by the rescan
+        """
+        new_fields: Dict[str, Any] = {}
+        while not self.complete and self._start is not None:
+            self._discard(new_fields)
+            self._scan(new_fields)
+        return new_fields
+
+    def _scan(self, new_fields: Dict[str, Any]) -> None:
+        """Consume the buffered text from the current position."""
+        while self._pos < len(self._buffer) and not self.complete:
+            i = self._pos
+            ch = self._buffer[i]
+            self._pos += 1
+
+            if self._start is None:
+                if ch == '{':
+                    self._open_object(i)
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if self._expect_key and not ch.isspace():
+                # A member starts with its key, unless the object is empty
+                self._expect_key = False
+                if ch != '"' and not (ch == '}' and self._member_start == self._start + 1):
+                    self._discard(new_fields)
+                    continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_object(i, new_fields)
+            elif ch == ',' and self._depth == 1:
+                if not self._emit_member(self._member_start, i, new_fields):
+                    self._discard(new_fields)
+                    continue
+                self._member_start = i + 1
+                self._expect_key = True
+
+    def _open_object(self, index: int) -> None:
+        """Start tracking a candidate object at ``index``."""
+        self._start = index
+        self._member_start = index + 1
+        self._expect_key = True
+        self._depth = 1
+        self._in_string = False
+        self._escape = False
+
+    def _close_object(self, index: int, new_fields: Dict[str, Any]) -> None:
+        """Finish the candidate object ending at ``index``."""
+        try:
+            obj = json.loads(self._buffer[self._start:index + 1])
+        except json.JSONDecodeError:
+            obj = None
+
+        if not isinstance(obj, dict):
+            self._discard(new_fields)
+            return
+
+        self._emit_member(self._member_start, index, new_fields)
+        for key, value in obj.items():
+            if key not in self.fields:
+                self.fields[key] = value
+                new_fields[key] = value
+        self.result = obj
+
+    def _discard(self, new_fields: Dict[str, Any]) -> None:
+        """Abandon the current candidate and resume after its ``{``."""
+        if len(self.fields) > len(new_fields):
+            # Some fields were returned by earlier feed() calls
+            self.resets += 1
+
+        self._pos = self._start + 1
+        self._start = None
+        self._expect_key = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.fields = {}
+        new_fields.clear()
+
+    def _emit_member(self, start: int, end: int, new_fields: Dict[str, Any]) -> bool:
+        """Decode a ``"key": value`` member spanning ``[start, end)``.
+
+        Returns:
+            False if the text is not a valid member
+        """
+        segment = self._buffer[start:end].strip()
+        if not segment:
+            return False
+
+        decoder = json.JSONDecoder()
+        try:
+            key, key_end = decoder.raw_decode(segment)
+            rest = segment[key_end:].lstrip()
+            if not isinstance(key, str) or not rest.startswith(':'):
+                return False
+            value = json.loads(rest[1:])
+        except json.JSONDecodeError:
+            return False
+
+        if key not in self.fields:
+            self.fields[key] = value
+            new_fields[key] = value
+        return True
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Extract the first balanced JSON object from text.
+
+    Args:
+        text: Raw model output, possibly with fences or surrounding prose
+
+    Returns:
+        Decoded object, or None if no valid object is found
+    """
+    if not text or not isinstance(text, str):
+        return None
+
+    extractor = IncrementalJSONExtractor()
+    extractor.feed(text)
+    extractor.finish()
+    return extractor.result
@@ -0,0 +1,222 @@
+"""Structured, non-blocking logging.
+
+Log records are put on an in-memory queue by the request thread and written
+by a background ``QueueListener``, so slow log output never blocks a request.
+Each record carries the current request id, and can be rendered as one JSON
+object per line.
+
+High-volume INFO lines can be sampled by logging them with
+``extra={'sample': True}``; warnings and errors are always kept.
+"""
+
+import json
+import uuid
+import queue
+import random
+import atexit
+import logging
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Iterator, Optional
+
+_request_id: contextvars.ContextVar = contextvars.ContextVar('request_id', default=None)
+
+# Standard LogRecord attributes, excluded from the JSON "extra" fields
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+
+
+def new_request_id() -> str:
+    """Generate a request id."""
+    return uuid.uuid4().hex[:16]
+
+
+def get_request_id() -> Optional[str]:
+    """Return the request id of the current context, if any."""
+    return _request_id.get()
+
+
+def set_request_id(request_id: Optional[str]) -> contextvars.Token:
+    """Set the request id of the current context.
+
+    Args:
+        request_id: Request id (None to clear)
+
+    Returns:
+        Token to restore the previous value with ``reset_request_id``
+    """
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token) -> None:
+    """Restore the request id saved by ``set_request_id``."""
+    _request_id.reset(token)
+
+
+@contextmanager
+def request_context(request_id: Optional[str]) -> Iterator[Optional[str]]:
+    """Run a block with a request id, keeping the current one if None.
+
+    Args:
+        request_id: Request id to use
+
+    Yields:
+        The active request id
+    """
+    if request_id is None:
+        yield get_request_id()
+        return
+
+    token = set_request_id(request_id)
+    try:
+        yield request_id
+    finally:
+        reset_request_id(token)
+
+
+def truncate(value: Any, max_length: int = 500) -> str:
+    """Shorten a value for logging.
+
+    Args:
+        value: Value to log (converted to str)
+        max_length: Maximum length
+
+    Returns:
+        The value, cut with a marker giving the original length if too long
+    """
+    text = value if isinstance(value, str) else str(value)
+    if len(text) <= max_length:
+        return text
+    return f'{text[:max_length]}... [truncated {len(text)} chars]'
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request id to log records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'request_id'):
+            record.request_id = get_request_id()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of INFO records logged with ``sample=True``."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno > logging.INFO:
+            return True
+        if not getattr(record, 'sample', False):
+            return True
+        return random.random() < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    """Render log records as single-line JSON objects."""
+
+    def __init__(self, max_length: int = 2000):
+        super().__init__()
+        self.max_length = max_length
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': truncate(record.getMessage(), self.max_length),
+            'request_id': getattr(record, 'request_id', None)
+        }
+
+        for key, value in vars(record).items():
+            if key in _RECORD_ATTRS or key in entry or key == 'sample':
+                continue
+            if isinstance(value, str):
+                value = truncate(value, self.max_length)
+            entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _AsyncQueueHandler(QueueHandler):
+    """Queue handler that keeps exceptions separate from the message.
+
+    The stock handler formats the whole record in the calling thread; this
+    one only merges the message arguments and renders the traceback, leaving
+    the final formatting to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _TextFormatter(logging.Formatter):
+    """Plain formatter showing ``-`` for records logged outside a request."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        request_id = getattr(record, 'request_id', None)
+        record.request_id = request_id or '-'
+        try:
+            return super().format(record)
+        finally:
+            record.request_id = request_id
+
+
+def setup_logging(config) -> QueueListener:
+    """Route all logging through a background queue listener.
+
+    Args:
+        config: Configuration class (LOG_LEVEL, LOG_FORMAT, LOG_JSON,
+            LOG_SAMPLE_RATE, LOG_MAX_FIELD_LENGTH)
+
+    Returns:
+        The running listener
+    """
+    global _listener
+
+    stop_logging()
+
+    output = logging.StreamHandler()
+    if config.LOG_JSON:
+        output.setFormatter(JSONFormatter(config.LOG_MAX_FIELD_LENGTH))
+    else:
+        output.setFormatter(_TextFormatter(config.LOG_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _AsyncQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(config.LOG_SAMPLE_RATE))
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(getattr(logging, config.LOG_LEVEL))
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+    return _listener
+
+
+@atexit.register
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
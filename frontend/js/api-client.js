@@ -98,6 +98,19 @@ export async function validateQuote(quoteData) {
     });
 }
 
+/**
+ * Exchange quote changes with the server
+ * @param {number} cursor - Last server sequence number seen
+ * @param {Array} changes - Local changes ({id, baseRevision, data} or {id, baseRevision, deleted})
+ * @returns {Promise<object>} Sync result (accepted, conflicts, rejected, changes, cursor, hasMore)
+ */
+export async function syncChanges(cursor, changes) {
+    return apiRequest('/api/sync', {
+        method: 'POST',
+        body: JSON.stringify({ cursor, changes })
+    });
+}
+
 /**
  * Health check
  * @returns {Promise<object>} Health status
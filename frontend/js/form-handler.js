@@ -4,11 +4,14 @@
  */
 
 import { generateAITexts } from './api-client.js';
-import { saveQuote, loadAllQuotes } from './storage.js';
+import { saveQuote, updateQuote, loadAllQuotes } from './storage.js';
+import { syncQuotes } from './sync.js';
 import { showNotification, formatPrice, validateEmail, sanitizeInput } from './utils.js';
 import { markFormClean, markFormDirty } from './main.js';
 
 let prestationsCount = 0;
+// Local ID of the quote being edited (null for a new, unsaved quote)
+let currentQuoteId = null;
 
 /**
  * Initialize form handlers
@@ -251,8 +254,14 @@ async function handleSave() {
     }
     
     try {
-        await saveQuote(data);
+        // Updating keeps the quote's syncId and revision for the server
+        if (currentQuoteId !== null) {
+            await updateQuote(currentQuoteId, data);
+        } else {
+            currentQuoteId = await saveQuote(data);
+        }
         markFormClean();
+        syncQuotes();
     } catch (error) {
         console.error('Save error:', error);
         showNotification('Erreur lors de la sauvegarde', 'error');
@@ -305,6 +314,7 @@ function createLoadModal(quotes) {
         `;
         item.onclick = () => {
             fillFormData(quote.data);
+            currentQuoteId = quote.id;
             modal.remove();
             showNotification('Devis chargé', 'success');
         };
@@ -331,6 +341,7 @@ function handleNew() {
         document.querySelectorAll('input, textarea, select').forEach(el => el.value = '');
         document.getElementById('prestations-container').innerHTML = '';
         prestationsCount = 0;
+        currentQuoteId = null;
         addPrestation();
         updateTotals();
         markFormClean();
@@ -6,6 +6,7 @@
 import { initFormHandlers } from './form-handler.js';
 import { initPDFGenerator } from './pdf-generator.js';
 import { initStorage } from './storage.js';
+import { initSync } from './sync.js';
 import { showNotification } from './utils.js';
 
 /**
@@ -28,6 +29,9 @@ async function initApp() {
         await initStorage();
         console.log('✅ Storage initialized');
         
+        // Start background sync with the server
+        initSync();
+        
         // Initialize form handlers
         initFormHandlers();
         console.log('✅ Form handlers initialized');
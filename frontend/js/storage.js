@@ -1,13 +1,22 @@
 /**
  * Storage Module
  * Handles local storage with IndexedDB for quote persistence
+ *
+ * Each quote record also carries its sync state with the server:
+ * - syncId: server quote id
+ * - revision: server revision the local data is based on (0 = never synced)
+ * - dirty: 1 when local changes are waiting to be uploaded, 2 when the
+ *   server rejected them (reason in syncError) until the quote is edited again
+ * - deleted: tombstone kept until the deletion is synced
  */
 
 import { showNotification } from './utils.js';
 
 const DB_NAME = 'LDRQuotesDB';
-const DB_VERSION = 1;
+const DB_VERSION = 2;
 const STORE_NAME = 'quotes';
+const META_STORE_NAME = 'meta';
+const SYNC_CURSOR_KEY = 'syncCursor';
 
 let db = null;
 
@@ -32,6 +41,7 @@ export async function initStorage() {
         
         request.onupgradeneeded = (event) => {
             const db = event.target.result;
+            const transaction = event.target.transaction;
             
             // Create object store if it doesn't exist
             if (!db.objectStoreNames.contains(STORE_NAME)) {
@@ -47,6 +57,25 @@ export async function initStorage() {
                 
                 console.log('📦 Object store created');
             }
+            
+            // v2: sync state
+            if (event.oldVersion < 2) {
+                const objectStore = transaction.objectStore(STORE_NAME);
+                objectStore.createIndex('syncId', 'syncId', { unique: true });
+                objectStore.createIndex('dirty', 'dirty', { unique: false });
+                db.createObjectStore(META_STORE_NAME);
+                
+                // Existing quotes are queued for their first upload
+                objectStore.openCursor().onsuccess = (e) => {
+                    const cursor = e.target.result;
+                    if (cursor) {
+                        cursor.update({ ...cursor.value, syncId: newSyncId(), revision: 0, dirty: 1 });
+                        cursor.continue();
+                    }
+                };
+                
+                console.log('📦 Sync indexes created');
+            }
         };
     });
 }
@@ -67,7 +96,10 @@ export async function saveQuote(quoteData) {
         
         const quote = {
             timestamp: new Date().toISOString(),
-            data: quoteData
+            data: quoteData,
+            syncId: newSyncId(),
+            revision: 0,
+            dirty: 1
         };
         
         const request = store.add(quote);
@@ -101,7 +133,7 @@ export async function loadAllQuotes() {
         const request = store.getAll();
         
         request.onsuccess = () => {
-            resolve(request.result);
+            resolve(request.result.filter(quote => !quote.deleted));
         };
         
         request.onerror = () => {
@@ -127,7 +159,7 @@ export async function loadQuote(id) {
         const request = store.get(id);
         
         request.onsuccess = () => {
-            if (request.result) {
+            if (request.result && !request.result.deleted) {
                 console.log('✅ Quote loaded:', id);
                 resolve(request.result);
             } else {
@@ -155,18 +187,24 @@ export async function deleteQuote(id) {
     return new Promise((resolve, reject) => {
         const transaction = db.transaction([STORE_NAME], 'readwrite');
         const store = transaction.objectStore(STORE_NAME);
-        const request = store.delete(id);
+        const request = store.get(id);
         
         request.onsuccess = () => {
+            if (request.result) {
+                markDeleted(store, request.result);
+            }
+        };
+        
+        transaction.oncomplete = () => {
             console.log('✅ Quote deleted:', id);
             showNotification('Devis supprimé', 'success');
             resolve();
         };
         
-        request.onerror = () => {
-            console.error('Failed to delete quote:', request.error);
+        transaction.onerror = () => {
+            console.error('Failed to delete quote:', transaction.error);
             showNotification('Erreur lors de la suppression', 'error');
-            reject(request.error);
+            reject(transaction.error);
         };
     });
 }
@@ -185,25 +223,32 @@ export async function updateQuote(id, quoteData) {
     return new Promise((resolve, reject) => {
         const transaction = db.transaction([STORE_NAME], 'readwrite');
         const store = transaction.objectStore(STORE_NAME);
+        const request = store.get(id);
         
-        const quote = {
-            id: id,
-            timestamp: new Date().toISOString(),
-            data: quoteData
+        request.onsuccess = () => {
+            const existing = request.result || { syncId: newSyncId(), revision: 0 };
+            
+            store.put({
+                ...existing,
+                id: id,
+                timestamp: new Date().toISOString(),
+                data: quoteData,
+                deleted: false,
+                dirty: 1,
+                syncError: null
+            });
         };
         
-        const request = store.put(quote);
-        
-        request.onsuccess = () => {
+        transaction.oncomplete = () => {
             console.log('✅ Quote updated:', id);
             showNotification('Devis mis à jour', 'success');
             resolve();
         };
         
-        request.onerror = () => {
-            console.error('Failed to update quote:', request.error);
+        transaction.onerror = () => {
+            console.error('Failed to update quote:', transaction.error);
             showNotification('Erreur lors de la mise à jour', 'error');
-            reject(request.error);
+            reject(transaction.error);
         };
     });
 }
@@ -224,18 +269,241 @@ export async function clearAllQuotes() {
     return new Promise((resolve, reject) => {
         const transaction = db.transaction([STORE_NAME], 'readwrite');
         const store = transaction.objectStore(STORE_NAME);
-        const request = store.clear();
+        const request = store.openCursor();
         
         request.onsuccess = () => {
+            const cursor = request.result;
+            if (cursor) {
+                markDeleted(store, cursor.value);
+                cursor.continue();
+            }
+        };
+        
+        transaction.oncomplete = () => {
             console.log('✅ All quotes cleared');
             showNotification('Tous les devis supprimés', 'success');
             resolve();
         };
         
-        request.onerror = () => {
-            console.error('Failed to clear quotes:', request.error);
+        transaction.onerror = () => {
+            console.error('Failed to clear quotes:', transaction.error);
             showNotification('Erreur lors de la suppression', 'error');
-            reject(request.error);
+            reject(transaction.error);
         };
     });
+}
+
+/**
+ * Delete a quote record, keeping a tombstone if the server knows it
+ * @param {IDBObjectStore} store - Quotes store (readwrite)
+ * @param {object} quote - Quote record
+ */
+function markDeleted(store, quote) {
+    if (quote.revision > 0) {
+        store.put({ ...quote, data: null, deleted: true, dirty: 1, syncError: null, timestamp: new Date().toISOString() });
+    } else {
+        store.delete(quote.id);
+    }
+}
+
+/**
+ * Generate a server quote id
+ * @returns {string} Random id
+ */
+function newSyncId() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID().replace(/-/g, '');
+    }
+    return Date.now().toString(36) + Math.random().toString(36).slice(2);
+}
+
+/**
+ * Run a single request in a transaction
+ * @param {string} storeName - Object store name
+ * @param {string} mode - Transaction mode
+ * @param {function} action - Receives the store, returns an IDBRequest
+ * @returns {Promise<any>} Request result
+ */
+function storeRequest(storeName, mode, action) {
+    if (!db) {
+        return Promise.reject(new Error('Database not initialized'));
+    }
+    
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction([storeName], mode);
+        const request = action(transaction.objectStore(storeName));
+        
+        transaction.oncomplete = () => resolve(request.result);
+        transaction.onerror = () => reject(transaction.error);
+    });
+}
+
+/**
+ * Get quotes with local changes waiting to be uploaded
+ * @param {number} limit - Maximum number of quotes
+ * @returns {Promise<Array>} Dirty quote records (including tombstones)
+ */
+export async function getDirtyQuotes(limit) {
+    return storeRequest(STORE_NAME, 'readonly',
+        store => store.index('dirty').getAll(IDBKeyRange.only(1), limit));
+}
+
+/**
+ * Get the server sync cursor
+ * @returns {Promise<number>} Last server sequence number seen
+ */
+export async function getSyncCursor() {
+    const cursor = await storeRequest(META_STORE_NAME, 'readonly',
+        store => store.get(SYNC_CURSOR_KEY));
+    return cursor || 0;
+}
+
+/**
+ * Save the server sync cursor
+ * @param {number} cursor - Last server sequence number seen
+ * @returns {Promise<void>}
+ */
+export async function setSyncCursor(cursor) {
+    await storeRequest(META_STORE_NAME, 'readwrite',
+        store => store.put(cursor, SYNC_CURSOR_KEY));
+}
+
+/**
+ * Record that an uploaded quote was accepted by the server
+ * @param {object} uploaded - Record as it was uploaded
+ * @param {number} revision - Server revision
+ * @returns {Promise<void>}
+ */
+export async function markQuoteSynced(uploaded, revision) {
+    if (!db) {
+        throw new Error('Database not initialized');
+    }
+    
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction([STORE_NAME], 'readwrite');
+        const store = transaction.objectStore(STORE_NAME);
+        const request = store.get(uploaded.id);
+        
+        request.onsuccess = () => {
+            const quote = request.result;
+            if (!quote) {
+                return;
+            }
+            
+            // Edited again during the sync: keep it dirty, on top of the new revision
+            const unchanged = quote.timestamp === uploaded.timestamp;
+            
+            if (unchanged && quote.deleted) {
+                store.delete(quote.id);
+            } else {
+                store.put({ ...quote, revision: revision, dirty: unchanged ? 0 : 1 });
+            }
+        };
+        
+        transaction.oncomplete = () => resolve();
+        transaction.onerror = () => reject(transaction.error);
+    });
+}
+
+/**
+ * Record that an uploaded quote was rejected by the server
+ *
+ * The quote is set aside (dirty: 2) so it does not hold back other uploads;
+ * editing it again queues it for upload.
+ *
+ * @param {object} uploaded - Record as it was uploaded
+ * @param {string} error - Rejection reason
+ * @returns {Promise<void>}
+ */
+export async function markQuoteRejected(uploaded, error) {
+    if (!db) {
+        throw new Error('Database not initialized');
+    }
+    
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction([STORE_NAME], 'readwrite');
+        const store = transaction.objectStore(STORE_NAME);
+        const request = store.get(uploaded.id);
+        
+        request.onsuccess = () => {
+            const quote = request.result;
+            
+            // Edited again during the sync: the new version gets its own chance
+            if (quote && quote.timestamp === uploaded.timestamp) {
+                store.put({ ...quote, dirty: 2, syncError: error });
+            }
+        };
+        
+        transaction.oncomplete = () => resolve();
+        transaction.onerror = () => reject(transaction.error);
+    });
+}
+
+/**
+ * Apply a quote version received from the server
+ *
+ * With ``keepLocalCopy``, local data that differs from the server version is
+ * saved as a new quote instead of being lost (used for conflicts).
+ * Otherwise quotes with pending local changes are left untouched: their
+ * next upload reports the conflict. Rejected local data is always kept as
+ * a separate (still rejected) quote.
+ *
+ * @param {object} change - Server change ({id, revision, timestamp, data} or {id, revision, deleted})
+ * @param {boolean} keepLocalCopy - Keep conflicting local data as a new quote
+ * @returns {Promise<boolean>} True if a local copy was created
+ */
+export async function applyRemoteQuote(change, keepLocalCopy = false) {
+    if (!db) {
+        throw new Error('Database not initialized');
+    }
+    
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction([STORE_NAME], 'readwrite');
+        const store = transaction.objectStore(STORE_NAME);
+        const request = store.index('syncId').get(change.id);
+        let copied = false;
+        
+        request.onsuccess = () => {
+            const local = request.result;
+            
+            if (local && local.dirty === 1 && !keepLocalCopy) {
+                return;
+            }
+            
+            if (local && local.dirty && !local.deleted) {
+                store.add({
+                    timestamp: local.timestamp,
+                    data: local.data,
+                    syncId: newSyncId(),
+                    revision: 0,
+                    dirty: local.dirty,
+                    syncError: local.syncError || null
+                });
+                copied = true;
+            }
+            
+            if (change.deleted) {
+                if (local) {
+                    store.delete(local.id);
+                }
+                return;
+            }
+            
+            const quote = {
+                timestamp: change.timestamp || new Date().toISOString(),
+                data: change.data,
+                syncId: change.id,
+                revision: change.revision,
+                dirty: 0
+            };
+            if (local) {
+                quote.id = local.id;
+            }
+            
+            store.put(quote);
+        };
+        
+        transaction.oncomplete = () => resolve(copied);
+        transaction.onerror = () => reject(transaction.error);
+    });
 }
\ No newline at end of file
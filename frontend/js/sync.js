@@ -0,0 +1,119 @@
+/**
+ * Sync Module
+ * Offline-first synchronisation of IndexedDB quotes with the server
+ *
+ * Only changed quotes travel: local edits are uploaded in batches, and the
+ * server sends back the quotes changed since the last cursor.
+ */
+
+import { syncChanges } from './api-client.js';
+import {
+    getDirtyQuotes,
+    getSyncCursor,
+    setSyncCursor,
+    markQuoteSynced,
+    markQuoteRejected,
+    applyRemoteQuote
+} from './storage.js';
+import { showNotification } from './utils.js';
+
+/**
+ * Configuration
+ */
+const config = {
+    batchSize: 50, // first batch; then the server's SYNC_BATCH_SIZE is used
+    interval: 60000 // 1 minute
+};
+
+let syncing = false;
+let batchSize = config.batchSize;
+
+/**
+ * Synchronise local quotes with the server
+ * @returns {Promise<object|null>} Counts of uploaded, downloaded, conflicting and rejected quotes, or null if skipped
+ */
+export async function syncQuotes() {
+    if (syncing || !navigator.onLine) {
+        return null;
+    }
+    
+    syncing = true;
+    const stats = { uploaded: 0, downloaded: 0, conflicts: 0, rejected: 0 };
+    
+    try {
+        let more = true;
+        
+        while (more) {
+            const cursor = await getSyncCursor();
+            const requested = batchSize;
+            const dirty = await getDirtyQuotes(requested);
+            const bySyncId = new Map(dirty.map(quote => [quote.syncId, quote]));
+            
+            const changes = dirty.map(quote => quote.deleted
+                ? { id: quote.syncId, baseRevision: quote.revision, deleted: true }
+                : { id: quote.syncId, baseRevision: quote.revision, data: quote.data });
+            
+            const result = await syncChanges(cursor, changes);
+            
+            for (const accepted of result.accepted) {
+                await markQuoteSynced(bySyncId.get(accepted.id), accepted.revision);
+            }
+            
+            for (const conflict of result.conflicts) {
+                await applyRemoteQuote(conflict, true);
+            }
+            
+            for (const change of result.changes) {
+                await applyRemoteQuote(change);
+            }
+            
+            for (const rejected of result.rejected) {
+                console.warn('Sync rejected quote:', rejected.id, rejected.error);
+                if (bySyncId.has(rejected.id)) {
+                    await markQuoteRejected(bySyncId.get(rejected.id), rejected.error);
+                }
+            }
+            
+            await setSyncCursor(result.cursor);
+            
+            stats.uploaded += result.accepted.length;
+            stats.downloaded += result.changes.length;
+            stats.conflicts += result.conflicts.length;
+            stats.rejected += result.rejected.length;
+            
+            // The server may process fewer changes than sent: it returns its limit
+            batchSize = result.batchSize || batchSize;
+            
+            // Stop when nothing is left, or when a batch made no progress
+            const handled = result.accepted.length + result.conflicts.length + result.rejected.length;
+            more = result.hasMore ||
+                (handled > 0 && (dirty.length === requested || handled < dirty.length));
+        }
+        
+        if (stats.conflicts > 0) {
+            showNotification(
+                `${stats.conflicts} devis modifié(s) ailleurs : vos versions ont été conservées en copie`,
+                'warning'
+            );
+        }
+        
+        console.log('✅ Sync complete:', stats);
+        return stats;
+        
+    } catch (error) {
+        console.warn('Sync failed, will retry later:', error.message);
+        return null;
+        
+    } finally {
+        syncing = false;
+    }
+}
+
+/**
+ * Start background synchronisation
+ */
+export function initSync() {
+    window.addEventListener('online', () => syncQuotes());
+    setInterval(() => syncQuotes(), config.interval);
+    syncQuotes();
+}
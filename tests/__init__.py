@@ -0,0 +1 @@
+"""Test suite for LDR Quote Generator."""
@@ -0,0 +1,53 @@
+"""Tests for AI response parsing and streamed generation."""
+
+import pytest
+
+from backend.api import ai_generator
+from backend.api.ai_generator import (
+    AIGenerationError, STREAM_RESET, parse_claude_response, stream_generate_with_ai
+)
+
+
+def stream_of(monkeypatch, chunks):
+    monkeypatch.setattr(ai_generator, 'stream_claude_api', lambda prompt, config=None: iter(chunks))
+
+
+def test_parse_text_block_with_prose():
+    response = {'content': [{'type': 'text', 'text': 'Voici {le JSON} :\n{"texte_presentation": "A", "informations_acces": "B"}'}]}
+    assert parse_claude_response(response) == {'texte_presentation': 'A', 'informations_acces': 'B'}
+
+
+def test_parse_tool_use_block():
+    response = {'content': [{'type': 'tool_use', 'input': {'texte_presentation': 'A', 'informations_acces': 'B'}}]}
+    assert parse_claude_response(response) == {'texte_presentation': 'A', 'informations_acces': 'B'}
+
+
+def test_parse_without_json():
+    with pytest.raises(AIGenerationError):
+        parse_claude_response({'content': [{'type': 'text', 'text': 'Désolé'}]})
+
+
+def test_stream_yields_fields(monkeypatch):
+    stream_of(monkeypatch, ['{"texte_presentation": "A", ', '"informations_acces": "B"}'])
+    assert list(stream_generate_with_ai('Lieu', 'Adresse')) == [
+        ('texte_presentation', 'A'), ('informations_acces', 'B')
+    ]
+
+
+def test_stream_resets_void_fields(monkeypatch):
+    stream_of(monkeypatch, [
+        '{"texte_presentation": "A", ',
+        'oops} {"texte_presentation": "B", "informations_acces": "C"}'
+    ])
+    assert list(stream_generate_with_ai('Lieu', 'Adresse')) == [
+        ('texte_presentation', 'A'),
+        (STREAM_RESET, ''),
+        ('texte_presentation', 'B'),
+        ('informations_acces', 'C')
+    ]
+
+
+def test_stream_missing_field(monkeypatch):
+    stream_of(monkeypatch, ['{"texte_presentation": "A"}'])
+    with pytest.raises(AIGenerationError):
+        list(stream_generate_with_ai('Lieu', 'Adresse'))
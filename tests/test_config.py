@@ -0,0 +1,104 @@
+"""Tests for runtime configuration reloading."""
+
+import json
+
+import pytest
+
+from backend.config import Config, ConfigStore, apply_settings, RELOADABLE_SETTINGS, TENANT_SETTINGS
+
+
+@pytest.fixture
+def settings_file(tmp_path):
+    path = tmp_path / 'settings.json'
+
+    def write(data):
+        path.write_text(data if isinstance(data, str) else json.dumps(data), encoding='utf-8')
+        return str(path)
+
+    return write
+
+
+def test_without_settings_file(tmp_path):
+    store = ConfigStore(Config, str(tmp_path / 'absent.json'))
+    assert store.get() is Config
+    assert store.get('ldr') is Config
+    assert store.current.version == 0
+
+
+def test_settings_and_tenants(settings_file):
+    store = ConfigStore(Config, settings_file({
+        'settings': {'CLAUDE_MAX_TOKENS': 800, 'CORS_ORIGINS': 'https://a.fr,https://b.fr'},
+        'tenants': {'ldr': {'CLAUDE_MAX_TOKENS': 1200, 'SYNC_BATCH_SIZE': 20}}
+    }))
+
+    assert store.get().CLAUDE_MAX_TOKENS == 800
+    assert store.get().CORS_ORIGINS == ['https://a.fr', 'https://b.fr']
+    assert store.get('ldr').CLAUDE_MAX_TOKENS == 1200
+    assert store.get('ldr').SYNC_BATCH_SIZE == 20
+    assert store.get('ldr').CORS_ORIGINS == ['https://a.fr', 'https://b.fr']
+    assert store.get('inconnu') is store.get()
+
+
+def test_reload_swaps_snapshot_and_notifies(settings_file):
+    path = settings_file({'settings': {'CLAUDE_MAX_TOKENS': 800}})
+    store = ConfigStore(Config, path)
+    before = store.current
+    seen = []
+    store.add_listener(seen.append)
+
+    settings_file({'settings': {'CLAUDE_MAX_TOKENS': 900}})
+    assert store.reload()
+    assert not store.reload()  # unchanged checksum
+
+    assert store.get().CLAUDE_MAX_TOKENS == 900
+    assert before.base.CLAUDE_MAX_TOKENS == 800
+    assert [snapshot.version for snapshot in seen] == [before.version + 1]
+
+
+@pytest.mark.parametrize('data', [
+    '{pas du json',
+    '[]',
+    {'settings': {'PORT': 8000}},
+    {'settings': {'CLAUDE_MAX_TOKENS': '800'}},
+    {'settings': {'CLAUDE_USE_TOOLS': 1}},
+    {'settings': {'LOG_LEVEL': 'BAVARD'}},
+    {'settings': {'SYNC_BATCH_SIZE': 0}},
+    {'settings': {'CLAUDE_MAX_TOKENS': -1}},
+    {'settings': {'LOG_SLOW_REQUEST_MS': -5}},
+    {'tenants': {'ldr': {'SYNC_BATCH_SIZE': 100000}}},
+    {'tenants': {'ldr': {'CLAUDE_API_KEY': 'autre-cle'}}},
+    {'tenants': {'ldr': {'CORS_ORIGINS': ['*']}}},
+    {'tenants': {'ldr': {'LOG_LEVEL': 'DEBUG'}}},
+    {'tenants': []},
+])
+def test_invalid_file_keeps_previous_version(settings_file, data):
+    store = ConfigStore(Config, settings_file({'settings': {'SYNC_BATCH_SIZE': 30}}))
+    version = store.current.version
+
+    settings_file(data)
+    assert not store.reload()
+
+    assert store.current.version == version
+    assert store.get().SYNC_BATCH_SIZE == 30
+
+
+def test_access_settings_are_global_only():
+    assert {'CLAUDE_API_KEY', 'CORS_ORIGINS'} <= RELOADABLE_SETTINGS
+    assert not {'CLAUDE_API_KEY', 'CORS_ORIGINS', 'LOG_LEVEL'} & TENANT_SETTINGS
+
+
+def test_apply_settings_bounds():
+    assert apply_settings(Config, {'SYNC_BATCH_SIZE': 1}, RELOADABLE_SETTINGS, 'T').SYNC_BATCH_SIZE == 1
+    assert apply_settings(Config, {'LOG_SLOW_REQUEST_MS': 0}, RELOADABLE_SETTINGS, 'T').LOG_SLOW_REQUEST_MS == 0
+    with pytest.raises(ValueError, match='SYNC_BATCH_SIZE must be >= 1'):
+        apply_settings(Config, {'SYNC_BATCH_SIZE': 0}, RELOADABLE_SETTINGS, 'T')
+
+
+def test_validate_reports_out_of_range_environment():
+    class Broken(Config):
+        CLAUDE_API_KEY = 'key'
+        SYNC_BATCH_SIZE = 0
+
+    result = Broken.validate()
+    assert not result['valid']
+    assert 'SYNC_BATCH_SIZE must be >= 1' in result['issues']
@@ -0,0 +1,44 @@
+"""Tests for structural deltas."""
+
+import pytest
+
+from backend.utils.delta import compute_delta, apply_delta
+
+
+@pytest.mark.parametrize('old, new', [
+    ({'a': 1, 'b': 2}, {'a': 1, 'c': 3}),
+    ({'lines': [{'q': 1}, {'q': 2}, {'q': 3}]}, {'lines': [{'q': 1}, {'q': 5}]}),
+    ({'lines': [1]}, {'lines': [1, 2, 3]}),
+    ({'a': {'b': {'c': 1}}}, {'a': {'b': {'c': 1.0}}}),
+    ({'a': [1, 2]}, {'a': 'texte'}),
+    ({}, {'a': None}),
+    ([1, 2], {'a': 1}),
+])
+def test_apply_computed_delta(old, new):
+    delta = compute_delta(old, new)
+    assert apply_delta(old, delta) == new
+
+
+def test_equal_documents_have_empty_delta():
+    assert compute_delta({'a': [1, {'b': 'x'}]}, {'a': [1, {'b': 'x'}]}) == []
+
+
+def test_delta_records_only_changes():
+    old = {'client': 'ACME', 'lines': [{'q': 1, 'd': 'Salle'}] * 50}
+    new = {'client': 'ACME', 'lines': [{'q': 1, 'd': 'Salle'}] * 49 + [{'q': 2, 'd': 'Salle'}]}
+    assert compute_delta(old, new) == [['set', ['lines', 49, 'q'], 2]]
+
+
+def test_int_and_bool_are_distinct():
+    assert compute_delta({'a': 1}, {'a': True}) == [['set', ['a'], True]]
+
+
+def test_apply_does_not_mutate_input():
+    old = {'a': [1, 2, 3]}
+    apply_delta(old, [['trunc', ['a'], 1], ['set', ['b'], 1]])
+    assert old == {'a': [1, 2, 3]}
+
+
+def test_apply_invalid_path():
+    with pytest.raises(ValueError):
+        apply_delta({'a': 1}, [['set', ['missing', 'b'], 1]])
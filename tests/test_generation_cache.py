@@ -0,0 +1,142 @@
+"""Tests for the precomputed venue text cache."""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from backend.api.generation_cache import GenerationCache, load_catalog, lookup_key
+
+VENUE = {'id': 'chateau', 'titre': 'Château de Rivaulde', 'adresse': '1 route du Parc, 60300 Senlis'}
+TEXTS = {'texte_presentation': 'Cher client, ...', 'informations_acces': 'À 45 minutes de Paris.'}
+
+
+def test_lookup_ignores_case_and_spacing():
+    assert lookup_key('  Château  de Rivaulde', 'X') == lookup_key('château de rivaulde', 'x')
+
+
+def test_put_and_get_per_prompt_version():
+    cache = GenerationCache('v1')
+    cache.put(VENUE, TEXTS)
+    cache.put(VENUE, {**TEXTS, 'texte_presentation': 'Autre modèle'}, 'v2')
+
+    assert cache.get(VENUE['titre'], VENUE['adresse']) == TEXTS
+    assert cache.get(VENUE['titre'], VENUE['adresse'], 'v2')['texte_presentation'] == 'Autre modèle'
+    assert cache.get(VENUE['titre'], VENUE['adresse'], 'v3') is None
+    assert cache.prompt_versions == ['v1', 'v2']
+
+
+def test_is_fresh():
+    cache = GenerationCache('v1')
+    cache.put(VENUE, TEXTS)
+    assert cache.is_fresh(VENUE)
+    assert not cache.is_fresh(VENUE, 'v2')
+    assert not cache.is_fresh({**VENUE, 'adresse': 'Nouvelle adresse'})
+
+
+def test_save_and_load_all_versions(tmp_path):
+    path = str(tmp_path / 'venue_texts.json')
+    cache = GenerationCache('v1')
+    cache.put(VENUE, TEXTS)
+    cache.put(VENUE, TEXTS, 'v2')
+    cache.save(path)
+
+    loaded = GenerationCache('v2')
+    assert loaded.load(path) == 2
+    assert loaded.get(VENUE['titre'], VENUE['adresse'], 'v1') == TEXTS
+    assert loaded.is_fresh(VENUE)
+
+
+def test_load_previous_format(tmp_path):
+    path = tmp_path / 'venue_texts.json'
+    cache = GenerationCache('v1')
+    cache.put(VENUE, TEXTS)
+    entry = cache.entry('chateau')
+    path.write_text(json.dumps({'format_version': 1, 'entries': {'chateau': entry}}), encoding='utf-8')
+
+    loaded = GenerationCache()
+    assert loaded.load(str(path)) == 1
+    assert loaded.get(VENUE['titre'], VENUE['adresse'], 'v1') == TEXTS
+
+
+def test_prune_venues_and_versions():
+    cache = GenerationCache('v1')
+    other = {'id': 'ferme', 'titre': 'La Ferme', 'adresse': 'Giverny'}
+    cache.put(VENUE, TEXTS)
+    cache.put(VENUE, TEXTS, 'old')
+    cache.put(other, TEXTS)
+
+    assert cache.prune(['chateau'], ['v1']) == ['ferme']
+    assert cache.prompt_versions == ['v1']
+    assert len(cache) == 1
+
+
+def test_watch_reloads_changed_file(tmp_path):
+    path = str(tmp_path / 'venue_texts.json')
+    GenerationCache('v1').save(path)
+
+    cache = GenerationCache('v1')
+    cache.load(path)
+    cache.watch(path, 0.01)
+    try:
+        writer = GenerationCache('v1')
+        writer.put(VENUE, TEXTS)
+        writer.save(path)
+        os.utime(path, (time.time() + 5, time.time() + 5))
+
+        deadline = time.time() + 2
+        while cache.get(VENUE['titre'], VENUE['adresse']) is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get(VENUE['titre'], VENUE['adresse']) == TEXTS
+    finally:
+        cache.stop()
+
+
+def test_reload_keeps_lookups_consistent(tmp_path):
+    path = str(tmp_path / 'venue_texts.json')
+    writer = GenerationCache('v1')
+    for i in range(200):
+        writer.put({**VENUE, 'id': f'salle-{i}', 'titre': f'Salle {i}'}, TEXTS)
+    writer.put(VENUE, TEXTS)
+    writer.save(path)
+
+    cache = GenerationCache('v1')
+    cache.load(path)
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                if cache.get(VENUE['titre'], VENUE['adresse']) is None:
+                    errors.append('miss')
+                cache.prompt_versions
+                len(cache)
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for _ in range(50):
+            cache.load(path)
+    finally:
+        stop.set()
+        reader.join()
+    assert errors == []
+
+
+def test_load_catalog_csv(tmp_path):
+    path = tmp_path / 'venues.csv'
+    path.write_text('titre,adresse\nLa Ferme,Giverny\n', encoding='utf-8')
+    assert load_catalog(str(path)) == [{'id': 'la ferme', 'titre': 'La Ferme', 'adresse': 'Giverny'}]
+
+
+def test_load_catalog_duplicates(tmp_path):
+    path = tmp_path / 'venues.json'
+    path.write_text(json.dumps([{'titre': 'A', 'adresse': 'x'}, {'titre': 'a', 'adresse': 'y'}]),
+                    encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_catalog(str(path))
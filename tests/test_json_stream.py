@@ -0,0 +1,98 @@
+"""Tests for incremental JSON extraction."""
+
+from backend.utils.json_stream import IncrementalJSONExtractor, extract_json_object
+
+
+def feed_all(extractor, chunks):
+    """Feed chunks one by one, collecting every returned field."""
+    emitted = []
+    for chunk in chunks:
+        emitted.extend(extractor.feed(chunk).items())
+    emitted.extend(extractor.finish().items())
+    return emitted
+
+
+def test_extract_plain_object():
+    assert extract_json_object('{"a": 1, "b": "x"}') == {'a': 1, 'b': 'x'}
+
+
+def test_extract_from_fences_and_prose():
+    text = 'Voici le résultat :\n```json\n{"a": "{not a brace}", "b": [1, {"c": 2}]}\n```\nMerci.'
+    assert extract_json_object(text) == {'a': '{not a brace}', 'b': [1, {'c': 2}]}
+
+
+def test_extract_skips_prose_braces():
+    assert extract_json_object('Entre {accolades} puis {"a": 1}') == {'a': 1}
+
+
+def test_extract_skips_unmatched_brace():
+    assert extract_json_object('Un { seul puis {"a": 1}') == {'a': 1}
+
+
+def test_extract_skips_unclosed_candidate():
+    assert extract_json_object('{"a": 1 puis {"b": 2}') == {'b': 2}
+
+
+def test_extract_escaped_quotes():
+    assert extract_json_object(r'{"a": "il dit \"}\" puis part"}') == {'a': 'il dit "}" puis part'}
+
+
+def test_extract_empty_object():
+    assert extract_json_object('avant {} après') == {}
+
+
+def test_extract_nothing():
+    assert extract_json_object('Pas de JSON ici') is None
+    assert extract_json_object('') is None
+    assert extract_json_object(None) is None
+
+
+def test_fields_emitted_before_object_closes():
+    extractor = IncrementalJSONExtractor()
+    assert extractor.feed('{"texte_presentation": "A"') == {}
+    assert extractor.feed(', "informations') == {'texte_presentation': 'A'}
+    assert extractor.feed('_acces": "B"}') == {'informations_acces': 'B'}
+    assert extractor.complete
+    assert extractor.result == {'texte_presentation': 'A', 'informations_acces': 'B'}
+
+
+def test_chunking_does_not_change_result():
+    text = 'Réponse : {"a": "x,y", "b": {"c": [1, 2]}, "d": "\\"q\\""} fin'
+    extractor = IncrementalJSONExtractor()
+    emitted = feed_all(extractor, list(text))
+    assert extractor.result == extract_json_object(text)
+    assert dict(emitted) == extractor.result
+
+
+def test_bogus_candidate_dropped_before_emitting():
+    extractor = IncrementalJSONExtractor()
+    emitted = feed_all(extractor, ['{selon vous, ', '{"a": 1, ', '"b": 2}'])
+    assert emitted == [('a', 1), ('b', 2)]
+    assert extractor.resets == 0
+
+
+def test_reset_when_emitted_fields_are_void():
+    extractor = IncrementalJSONExtractor()
+    assert extractor.feed('{"texte_presentation": "A", ') == {'texte_presentation': 'A'}
+    assert extractor.feed('oops} {"texte_presentation": "B", "x": 1}') == {
+        'texte_presentation': 'B', 'x': 1
+    }
+    assert extractor.resets == 1
+    assert extractor.result == {'texte_presentation': 'B', 'x': 1}
+
+
+def test_reset_on_unclosed_candidate_at_finish():
+    extractor = IncrementalJSONExtractor()
+    assert extractor.feed('{"a": 1, "c": ') == {'a': 1}
+    assert extractor.feed('{"b": 2}') == {}
+    assert not extractor.complete
+    assert extractor.finish() == {'b': 2}
+    assert extractor.resets == 1
+    assert extractor.result == {'b': 2}
+
+
+def test_feed_after_complete_is_ignored():
+    extractor = IncrementalJSONExtractor()
+    extractor.feed('{"a": 1}')
+    assert extractor.feed('{"b": 2}') == {}
+    assert extractor.result == {'a': 1}
@@ -0,0 +1,88 @@
+"""Tests for venue catalog precomputation."""
+
+import json
+
+from backend import precompute as precompute_module
+from backend.api.ai_generator import AIGenerationError
+from backend.api.generation_cache import GenerationCache
+from backend.config import Config
+
+
+def write_catalog(tmp_path, titles):
+    path = tmp_path / 'venues.json'
+    path.write_text(json.dumps([{'titre': t, 'adresse': f'{t} adresse'} for t in titles]),
+                    encoding='utf-8')
+    return str(path)
+
+
+def fake_generate(failures):
+    def generate(titre, adresse, config=None, request_id=None):
+        if titre in failures:
+            raise failures[titre]
+        return {'texte_presentation': f'P {titre}', 'informations_acces': f'A {titre}'}
+    return generate
+
+
+def test_failed_venues_do_not_stop_the_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(precompute_module, 'generate_with_ai', fake_generate({
+        'Bad': ValueError('invalid JSON'),
+        'Down': AIGenerationError('API returned status 529')
+    }))
+    catalog = write_catalog(tmp_path, ['Good', 'Bad', 'Down', 'Other'])
+    output = str(tmp_path / 'cache.json')
+
+    stats = precompute_module.precompute(catalog, output, workers=2, configs=[Config])
+
+    assert stats['generated'] == 2
+    assert sorted(stats['failed']) == ['bad', 'down']
+
+    cache = GenerationCache(precompute_module.get_prompt_version(Config))
+    assert cache.load(output) == 2
+    assert cache.get('Good', 'Good adresse') == {'texte_presentation': 'P Good', 'informations_acces': 'A Good'}
+
+
+def test_up_to_date_venues_are_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(precompute_module, 'generate_with_ai', fake_generate({}))
+    catalog = write_catalog(tmp_path, ['Good'])
+    output = str(tmp_path / 'cache.json')
+
+    precompute_module.precompute(catalog, output, workers=1, configs=[Config])
+    stats = precompute_module.precompute(catalog, output, workers=1, configs=[Config])
+
+    assert stats['generated'] == 0
+    assert stats['skipped'] == 1
+
+
+def test_texts_generated_for_each_prompt_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(precompute_module, 'generate_with_ai', fake_generate({}))
+    catalog = write_catalog(tmp_path, ['Good'])
+    output = str(tmp_path / 'cache.json')
+
+    class OtherModel(Config):
+        CLAUDE_MODEL = 'autre-modele'
+
+    class SameModel(Config):
+        CLAUDE_MAX_TOKENS = 1200
+
+    stats = precompute_module.precompute(catalog, output, workers=1,
+                                         configs=[Config, OtherModel, SameModel])
+    assert stats['versions'] == 2
+    assert stats['generated'] == 2
+
+    cache = GenerationCache()
+    cache.load(output)
+    for config in (Config, OtherModel):
+        assert cache.get('Good', 'Good adresse', precompute_module.get_prompt_version(config)) is not None
+
+
+def test_progress_saved_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(precompute_module, 'generate_with_ai', fake_generate({}))
+    monkeypatch.setattr(precompute_module, 'SAVE_EVERY', 2)
+    saves = []
+    monkeypatch.setattr(GenerationCache, 'save', lambda self, path: saves.append(len(self)))
+    catalog = write_catalog(tmp_path, ['A', 'B', 'C', 'D', 'E'])
+
+    precompute_module.precompute(catalog, str(tmp_path / 'cache.json'), workers=1, configs=[Config])
+
+    # Every second venue, then once at the end
+    assert saves == [2, 4, 5]
@@ -0,0 +1,281 @@
+"""Tests for quote revision history and sync."""
+
+import json
+
+import pytest
+
+from backend.api.quotes import QuoteManager, QuoteNotFoundError, QuoteConflictError
+
+
+def quote(client='ACME', lines=3, **extra):
+    return {
+        'clientCompany': client,
+        'quoteLines': [{'description': f'Ligne {i}', 'quantity': i + 1, 'unitPrice': 100} for i in range(lines)],
+        **extra
+    }
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return str(tmp_path / 'quotes')
+
+
+def test_revisions_rebuild_after_reload(storage):
+    manager = QuoteManager(storage, snapshot_interval=5)
+    versions = [quote(lines=n % 7 + 1, note=f'v{n}') for n in range(12)]
+    for data in versions:
+        manager.save_quote(data, 'q1')
+
+    reloaded = QuoteManager(storage, snapshot_interval=5)
+    for revision, data in enumerate(versions, start=1):
+        assert reloaded.get_quote('q1', revision) == data
+
+    types = [info['type'] for info in reloaded.list_revisions('q1')]
+    assert types[0] == 'snapshot' and types[5] == 'snapshot' and types[1] == 'delta'
+
+
+def test_unchanged_save_adds_no_revision():
+    manager = QuoteManager()
+    first = manager.save_quote(quote(), 'q1')
+    assert manager.save_quote(quote(), 'q1')['revision'] == first['revision'] == 1
+
+
+def test_saved_data_is_detached_from_caller():
+    manager = QuoteManager()
+    data = quote()
+    manager.save_quote(data, 'q1')
+    data['clientCompany'] = 'Autre'
+    assert manager.get_quote('q1')['clientCompany'] == 'ACME'
+
+
+def test_base_revision_conflict():
+    manager = QuoteManager()
+    manager.save_quote(quote(), 'q1', base_revision=0)
+    manager.save_quote(quote(client='B'), 'q1', base_revision=1)
+    with pytest.raises(QuoteConflictError):
+        manager.save_quote(quote(client='C'), 'q1', base_revision=1)
+
+
+def test_delete_keeps_history(storage):
+    manager = QuoteManager(storage)
+    manager.save_quote(quote(), 'q1')
+    assert manager.delete_quote('q1')['type'] == 'deleted'
+
+    with pytest.raises(QuoteNotFoundError):
+        manager.get_quote('q1')
+    assert manager.get_quote('q1', 1) == quote()
+
+    assert manager.save_quote(quote(client='B'), 'q1')['type'] == 'snapshot'
+    assert QuoteManager(storage).get_quote('q1') == quote(client='B')
+
+
+def test_diff():
+    manager = QuoteManager()
+    manager.save_quote(quote(), 'q1')
+    manager.save_quote(quote(client='B'), 'q1')
+    assert manager.diff('q1')['delta'] == [['set', ['clientCompany'], 'B']]
+    assert manager.diff('q1', 0, 1)['delta'] == [['set', [key], value] for key, value in quote().items()]
+    with pytest.raises(QuoteNotFoundError):
+        manager.diff('q1', 0, 5)
+    with pytest.raises(QuoteNotFoundError):
+        manager.diff('q1', to_revision=0)
+
+
+def test_unknown_and_invalid_ids():
+    manager = QuoteManager()
+    with pytest.raises(QuoteNotFoundError):
+        manager.get_quote('inconnu')
+    with pytest.raises(ValueError):
+        manager.save_quote(quote(), '../etc/passwd')
+
+
+def test_managers_sharing_storage_see_each_other(storage):
+    first = QuoteManager(storage)
+    second = QuoteManager(storage)
+
+    first.save_quote(quote(), 'shared')
+    assert second.get_quote('shared') == quote()
+
+    second.save_quote(quote(client='B'), 'shared', base_revision=1)
+    # The first manager cached revision 1: it must not save over revision 2
+    with pytest.raises(QuoteConflictError):
+        first.save_quote(quote(client='C'), 'shared', base_revision=1)
+
+    info = first.save_quote(quote(client='C'), 'shared')
+    assert info['revision'] == 3
+    assert [r['type'] for r in second.list_revisions('shared')] == ['snapshot', 'delta', 'delta']
+    assert second.diff('shared')['delta'] == [['set', ['clientCompany'], 'C']]
+
+    with open(f'{storage}/shared.jsonl', encoding='utf-8') as f:
+        revisions = [json.loads(line)['revision'] for line in f]
+    assert revisions == [1, 2, 3]
+
+
+def test_interrupted_write_is_discarded(storage):
+    manager = QuoteManager(storage)
+    manager.save_quote(quote(), 'q1')
+    with open(f'{storage}/q1.jsonl', 'a', encoding='utf-8') as f:
+        f.write('{"revision": 2, "timest')
+    with open(f'{storage}/changes.log', 'a', encoding='utf-8') as f:
+        f.write('{"seq": 2')
+
+    info = QuoteManager(storage).save_quote(quote(client='B'), 'q1')
+    assert (info['revision'], info['seq']) == (2, 2)
+
+    reloaded = QuoteManager(storage)
+    assert reloaded.get_quote('q1') == quote(client='B')
+    assert reloaded.changes_since(0)['cursor'] == 2
+
+
+def test_unknown_ids_are_not_cached():
+    manager = QuoteManager()
+    for n in range(5):
+        with pytest.raises(QuoteNotFoundError):
+            manager.get_quote(f'inconnu{n}')
+    with pytest.raises(QuoteConflictError):
+        manager.save_quote(quote(), 'nouveau', base_revision=3)
+    assert manager._histories == {}
+
+
+def test_sequence_numbers_shared_between_managers(storage):
+    first = QuoteManager(storage)
+    second = QuoteManager(storage)
+
+    seqs = [
+        first.save_quote(quote(), 'a')['seq'],
+        second.save_quote(quote(), 'b')['seq'],
+        first.save_quote(quote(client='B'), 'a')['seq'],
+        second.delete_quote('a')['seq'],
+        first.save_quote(quote(), 'c')['seq'],
+    ]
+    assert seqs == [1, 2, 3, 4, 5]
+
+    result = first.changes_since(0)
+    assert [(c['id'], c['seq']) for c in result['changes']] == [('b', 2), ('a', 4), ('c', 5)]
+    assert result['changes'][1]['deleted'] is True
+    assert result['cursor'] == 5
+
+
+def test_unlogged_quote_files_get_sequence_numbers(storage):
+    QuoteManager(storage).save_quote(quote(), 'a')
+    with open(f'{storage}/changes.log', 'w', encoding='utf-8'):
+        pass
+
+    manager = QuoteManager(storage)
+    assert [c['id'] for c in manager.changes_since(0)['changes']] == ['a']
+
+
+def test_changes_since_pages_with_cursor():
+    manager = QuoteManager()
+    for n in range(5):
+        manager.save_quote(quote(), f'q{n}')
+
+    first = manager.changes_since(0, limit=2)
+    assert [c['id'] for c in first['changes']] == ['q0', 'q1']
+    assert first['hasMore'] and first['cursor'] == 2
+
+    second = manager.changes_since(first['cursor'], limit=10)
+    assert [c['id'] for c in second['changes']] == ['q2', 'q3', 'q4']
+    assert not second['hasMore'] and second['cursor'] == 5
+
+    assert manager.changes_since(5)['changes'] == []
+    # A cursor ahead of the server (store reset) starts over
+    assert len(manager.changes_since(99)['changes']) == 5
+
+
+def test_sync_accepts_uploads_and_skips_echo():
+    manager = QuoteManager()
+    manager.save_quote(quote(client='Serveur'), 'remote')
+
+    result = manager.sync([{'id': 'local', 'baseRevision': 0, 'data': quote()}], cursor=0)
+
+    assert result['accepted'] == [{'id': 'local', 'revision': 1, 'seq': 2}]
+    assert [c['id'] for c in result['changes']] == ['remote']
+    assert result['cursor'] == 2
+
+
+def test_sync_reports_conflicts_with_server_version():
+    manager = QuoteManager()
+    manager.save_quote(quote(), 'q1')
+    manager.save_quote(quote(client='B'), 'q1')
+
+    result = manager.sync([{'id': 'q1', 'baseRevision': 1, 'data': quote(client='C')}], cursor=0)
+
+    assert result['accepted'] == []
+    assert result['conflicts'] == [{'id': 'q1', 'baseRevision': 1, 'revision': 2, 'data': quote(client='B')}]
+    assert result['changes'] == []
+    assert manager.get_quote('q1')['clientCompany'] == 'B'
+
+
+def test_sync_tombstones():
+    manager = QuoteManager()
+    manager.save_quote(quote(), 'q1')
+
+    result = manager.sync([
+        {'id': 'q1', 'baseRevision': 1, 'deleted': True},
+        {'id': 'jamais-vu', 'baseRevision': 0, 'deleted': True}
+    ], cursor=1)
+
+    assert result['accepted'] == [
+        {'id': 'q1', 'revision': 2, 'seq': 2},
+        {'id': 'jamais-vu', 'revision': 0, 'seq': None}
+    ]
+    with pytest.raises(QuoteNotFoundError):
+        manager.get_quote('q1')
+
+    other_client = manager.changes_since(1)
+    assert other_client['changes'][0]['deleted'] is True
+
+
+def test_sync_rejects_invalid_changes():
+    manager = QuoteManager()
+
+    result = manager.sync([
+        {'baseRevision': 0, 'data': quote()},
+        {'id': '../x', 'baseRevision': 0, 'data': quote()},
+        {'id': 'q1', 'baseRevision': 0},
+        'pas un objet'
+    ], cursor=0)
+
+    assert [r['id'] for r in result['rejected']] == [None, '../x', 'q1', None]
+    assert result['accepted'] == []
+    assert manager.changes_since(0)['changes'] == []
+    assert manager._histories == {}
+
+
+def test_sync_processes_a_prefix_of_large_batches():
+    manager = QuoteManager()
+    changes = [{'id': f'q{n}', 'baseRevision': 0, 'data': quote()} for n in range(3)]
+
+    result = manager.sync(changes, cursor=0, limit=2)
+
+    assert [a['id'] for a in result['accepted']] == ['q0', 'q1']
+    assert result['batchSize'] == 2
+    assert manager.sync(changes[2:], cursor=result['cursor'], limit=2)['accepted'][0]['id'] == 'q2'
+
+
+def test_sync_with_invalid_limit():
+    manager = QuoteManager()
+    manager.save_quote(quote(), 'q1')
+    result = manager.sync([], cursor=0, limit=0)
+    assert [c['id'] for c in result['changes']] == ['q1']
+    assert result['batchSize'] == 1
+
+
+def test_sync_rejects_malformed_batch():
+    with pytest.raises(ValueError):
+        QuoteManager().sync({'id': 'q1'}, cursor=0)
+
+
+def test_sync_conflict_for_quote_unknown_to_server():
+    manager = QuoteManager()
+
+    result = manager.sync([{'id': 'x', 'baseRevision': 3, 'data': quote()}], cursor=7)
+
+    assert result['conflicts'] == [{'id': 'x', 'baseRevision': 3, 'revision': 0, 'deleted': True}]
+    assert result['accepted'] == []
+    assert manager._histories == {}
+
+    # Uploaded again as a new quote, it is accepted
+    retry = manager.sync([{'id': 'x', 'baseRevision': 0, 'data': quote()}], cursor=result['cursor'])
+    assert retry['accepted'] == [{'id': 'x', 'revision': 1, 'seq': 1}]
@@ -0,0 +1,50 @@
+"""Tests for structured logging."""
+
+import json
+import logging
+
+from backend.utils.structured_logging import (
+    JSONFormatter, RequestIdFilter, SamplingFilter, _TextFormatter, request_context, truncate
+)
+
+
+def make_record(msg='Saved %s', args=('q1',), level=logging.INFO, **extra):
+    record = logging.LogRecord('test', level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    RequestIdFilter().filter(record)
+    return record
+
+
+def test_text_formatter_outside_request():
+    formatter = _TextFormatter('[%(request_id)s] %(message)s')
+    assert formatter.format(make_record()) == '[-] Saved q1'
+
+
+def test_text_formatter_in_request():
+    formatter = _TextFormatter('[%(request_id)s] %(message)s')
+    with request_context('abc123'):
+        record = make_record()
+    assert formatter.format(record) == '[abc123] Saved q1'
+
+
+def test_json_formatter_fields():
+    with request_context('abc123'):
+        record = make_record(duration_ms=12, body='x' * 50)
+    entry = json.loads(JSONFormatter(max_length=10).format(record))
+    assert entry['message'] == 'Saved q1'
+    assert entry['request_id'] == 'abc123'
+    assert entry['duration_ms'] == 12
+    assert entry['body'].startswith('xxxxxxxxxx... [truncated 50')
+
+
+def test_sampling_only_drops_sampled_info():
+    sampler = SamplingFilter(0.0)
+    assert not sampler.filter(make_record(sample=True))
+    assert sampler.filter(make_record())
+    assert sampler.filter(make_record(level=logging.ERROR, sample=True))
+
+
+def test_truncate():
+    assert truncate('court', 10) == 'court'
+    assert truncate('a' * 20, 5) == 'aaaaa... [truncated 20 chars]'